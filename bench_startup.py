@@ -0,0 +1,96 @@
+"""
+Startup benchmark for a library-only session: time until the app is ready to show the window,
+without launching the browser.
+Each run starts a fresh interpreter with main.py's configuration on a one-novel library and exits
+with an error when the median goes over the threshold, a heavy dependency (ML stack, pandas) was
+loaded during startup, a browser was started or library update sweeps are enabled (they start
+browsers in the background, only the CLI daemon runs them).
+
+    python bench_startup.py --runs 5 --threshold 1.0
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+
+HEAVY_MODULES = ['ml_processor', 'torch', 'transformers', 'pandas']
+
+SEED_SCRIPT = '''
+from db.file import SimpleFileDB
+from logic.entities import Novel, Chapter
+from logic.websites import Website
+db = SimpleFileDB()
+db.save_novel(Novel('Bench', 'author', 'https://www.webnovel.com/book/bench', '', Website.Webnovel,
+                    chapter_list=[Chapter('Chapter 1', 'https://www.webnovel.com/book/bench/1')]))
+db.close()
+'''
+
+STARTUP_SCRIPT = '''
+import json, sys, time
+start = time.perf_counter()
+from inyector import build_downloader
+import ui
+from main import APP_CONFIG
+imported = time.perf_counter()
+downloader = build_downloader(**APP_CONFIG)
+ready = time.perf_counter()
+# Give background threads a moment to (wrongly) reach for a browser
+time.sleep(1)
+scrapper = downloader.scrapper
+started_browser = scrapper.driver.is_started() or bool(scrapper.pool and scrapper.pool._workers)
+update_sweeps = downloader.scheduler is not None
+downloader.close()
+print(json.dumps({
+    'imports': imported - start,
+    'total': ready - start,
+    'started_browser': started_browser,
+    'update_sweeps': update_sweeps,
+    'heavy_modules': [name for name in %r if name in sys.modules],
+}))
+''' % HEAVY_MODULES
+
+
+def run_once(repo_path: str) -> dict:
+    with tempfile.TemporaryDirectory() as work_dir:
+        env = dict(os.environ, PYTHONPATH=repo_path)
+        subprocess.run([sys.executable, '-c', SEED_SCRIPT], cwd=work_dir, env=env, capture_output=True, check=True)
+        result = subprocess.run(
+            [sys.executable, '-c', STARTUP_SCRIPT], cwd=work_dir, env=env, capture_output=True, text=True, check=True
+        )
+    # Background threads may print after the result line
+    return json.loads(next(line for line in reversed(result.stdout.splitlines()) if line.startswith('{')))
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Measures the startup time of a library-only session.")
+    parser.add_argument('--runs', type=int, default=5)
+    parser.add_argument('--threshold', type=float, default=1.0, help="Maximum median startup in seconds")
+    args = parser.parse_args()
+
+    repo_path = os.path.dirname(os.path.abspath(__file__))
+    results = [run_once(repo_path) for _ in range(args.runs)]
+    imports = statistics.median(result['imports'] for result in results)
+    total = statistics.median(result['total'] for result in results)
+    print(f"Startup over {args.runs} runs: {total:.3f}s median ({imports:.3f}s importing)")
+
+    failures = []
+    if total > args.threshold:
+        failures.append(f"median startup {total:.3f}s is over {args.threshold:.3f}s")
+    heavy_modules = sorted({name for result in results for name in result['heavy_modules']})
+    if heavy_modules:
+        failures.append(f"heavy modules loaded at startup: {', '.join(heavy_modules)}")
+    if any(result['started_browser'] for result in results):
+        failures.append("the browser was started")
+    if any(result['update_sweeps'] for result in results):
+        failures.append("library update sweeps are enabled")
+
+    for failure in failures:
+        print(f"FAIL: {failure}")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,173 @@
+import argparse
+import contextlib
+import json
+import signal
+import sys
+import threading
+import time
+import traceback
+
+from inyector import build_downloader
+from logic.filter import ContentFilter
+from logic.novel_downloader import NovelDownloader
+from logic.websites import Website, get_website_for_url
+
+
+def parse_args(args=None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Downloads novels without the GUI, in a headless browser.")
+    parser.add_argument('urls', nargs='*', help="URLs of the novels main pages")
+    parser.add_argument('--file', help="File with one novel URL per line, optionally followed by a priority")
+    parser.add_argument('--daemon', action='store_true',
+                        help="Keep running, downloading queued jobs and checking the library for updates")
+    parser.add_argument('--update-interval', type=float, default=12,
+                        help="Hours between library update checks in daemon mode (default 12)")
+    parser.add_argument('--workers', type=int, default=3, help="Browser workers (default 3)")
+    parser.add_argument('--export', action='store_true', help="Export the downloaded novels to .txt")
+    parser.add_argument('--filter', action='store_true', help="Remove repeated blocks before exporting")
+    parser.add_argument('--max-per-volume', type=int, default=300, help="Chapters per exported file (default 300)")
+    parser.add_argument('--json', action='store_true', help="Report progress as JSON lines")
+    parser.add_argument('--archive-pages', action='store_true',
+                        help="Keep the raw HTML of chapter pages, see reextract.py")
+    parser.add_argument('--show-browser', action='store_true', help="Don't run the browser headless")
+    return parser.parse_args(args)
+
+
+def read_targets(args: argparse.Namespace) -> list[tuple[str, int]]:
+    """
+    Returns the (url, priority) pairs from the arguments and the job file.
+    """
+    targets = [(url, 0) for url in args.urls]
+    if args.file:
+        with open(args.file, encoding='utf-8') as file:
+            for line in file:
+                line = line.strip()
+                if not line or line.startswith('#'):
+                    continue
+                parts = line.split()
+                targets.append((parts[0], int(parts[1]) if len(parts) > 1 else 0))
+    return targets
+
+
+class Reporter:
+    """
+    Prints progress events to `output`, as text or as one JSON object per line.
+    """
+
+    def __init__(self, as_json: bool, output=None):
+        self.as_json = as_json
+        self.output = output if output else sys.stdout
+
+    def __call__(self, event: str, **fields):
+        if self.as_json:
+            print(json.dumps({'event': event, 'time': time.time(), **fields}), file=self.output, flush=True)
+        else:
+            details = ' '.join(f'{key}={value}' for key, value in fields.items())
+            print(f'[{event}] {details}', file=self.output, flush=True)
+
+
+def queue_novels(downloader: NovelDownloader, targets: list[tuple[str, int]],
+                 report: Reporter) -> tuple[list[str], list[str]]:
+    """
+    Queues the novels of the targets, returns the queued titles and the URLs that couldn't be queued.
+    """
+    titles = []
+    failed_urls = []
+    for url, priority in targets:
+        website = get_website_for_url(url)
+        if website is None:
+            report('error', url=url, error="Unsupported website")
+            failed_urls.append(url)
+            continue
+        try:
+            novels = downloader.search_novel(url, website.value)
+        except Exception as ex:
+            traceback.print_exc(file=sys.stderr)
+            report('error', url=url, error=str(ex))
+            failed_urls.append(url)
+            continue
+        if not novels:
+            report('error', url=url, error="Novel not found")
+            failed_urls.append(url)
+
+        for novel in novels:
+            downloader.enqueue_download(novel.title, priority)
+            titles.append(novel.title)
+            report('queued', title=novel.title, chapters=len(novel.chapter_list), priority=priority)
+    return titles, failed_urls
+
+
+def report_jobs(downloader: NovelDownloader, report: Reporter, last_state: dict, titles: list[str] = None):
+    """
+    Reports the jobs that changed since the last call, returns the jobs of `titles` (all of them by default).
+    """
+    jobs = [job for job in downloader.jobs.get_jobs() if titles is None or job.novel_title in titles]
+    for job in jobs:
+        state = (job.status, job.downloaded, job.total)
+        if last_state.get(job.novel_title) != state:
+            last_state[job.novel_title] = state
+            report('progress', title=job.novel_title, status=job.status, downloaded=job.downloaded,
+                   total=job.total, retries=job.retries, error=job.error)
+    return jobs
+
+
+def export_novel(downloader: NovelDownloader, novel_title: str, use_filter: bool, report: Reporter):
+    novel = downloader.open_novel(novel_title)
+    if novel is None:
+        return
+    if use_filter:
+        novel = ContentFilter().filter_content(novel)
+    downloader.write_novel(novel)
+    report('exported', title=novel_title)
+
+
+def main(args=None) -> int:
+    args = parse_args(args)
+    # Only the reports go to stdout, the progress the scrapper prints goes to stderr
+    report = Reporter(args.json, sys.stdout)
+    with contextlib.redirect_stdout(sys.stderr):
+        return run(args, report)
+
+
+def run(args: argparse.Namespace, report: Reporter) -> int:
+    stop = threading.Event()
+    for signal_number in (signal.SIGINT, signal.SIGTERM):
+        signal.signal(signal_number, lambda *_: stop.set())
+
+    downloader = build_downloader(
+        use_undetected=True,
+        max_per_volume=args.max_per_volume,
+        is_chromium=False,
+        workers=args.workers,
+        website_limits={Website.Webnovel: 1},
+        update_interval=args.update_interval * 60 * 60 if args.daemon else None,
+        headless=not args.show_browser,
+        archive_pages=args.archive_pages,
+    )
+    try:
+        titles, failed_urls = queue_novels(downloader, read_targets(args), report)
+        last_state = {}
+        exported = set()
+        while not stop.is_set():
+            jobs = report_jobs(downloader, report, last_state, None if args.daemon else titles)
+            if args.export:
+                for job in jobs:
+                    if job.status != 'done':
+                        # Updated novels are exported again once the new chapters are in
+                        exported.discard(job.novel_title)
+                    elif job.novel_title not in exported:
+                        export_novel(downloader, job.novel_title, args.filter, report)
+                        exported.add(job.novel_title)
+            if not args.daemon and all(job.status in ('done', 'failed', 'paused') for job in jobs):
+                break
+            stop.wait(5)
+
+        statuses = [state[0] for state in last_state.values()]
+        report('finished', done=statuses.count('done'), failed=statuses.count('failed'), paused=statuses.count('paused'),
+               not_queued=len(failed_urls))
+        return 1 if 'failed' in statuses or failed_urls else 0
+    finally:
+        downloader.close()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
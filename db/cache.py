@@ -0,0 +1,48 @@
+import sys
+import threading
+from collections import OrderedDict
+
+
+class ChapterCache:
+    """
+    LRU cache for chapter contents, bounded by the memory used by the cached text.
+    """
+
+    def __init__(self, max_bytes=64 * 1024 * 1024):
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()
+        self._size = 0
+        self._lock = threading.Lock()
+
+    def get(self, key) -> str | None:
+        with self._lock:
+            content = self._entries.get(key)
+            if content is not None:
+                self._entries.move_to_end(key)
+            return content
+
+    def put(self, key, content: str):
+        size = sys.getsizeof(content)
+        with self._lock:
+            self._discard(key)
+            if size > self.max_bytes:
+                return
+            self._entries[key] = content
+            self._size += size
+            while self._size > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self._size -= sys.getsizeof(evicted)
+
+    def discard(self, key):
+        with self._lock:
+            self._discard(key)
+
+    def discard_novel(self, novel_title: str):
+        with self._lock:
+            for key in [key for key in self._entries if key[0] == novel_title]:
+                self._discard(key)
+
+    def _discard(self, key):
+        content = self._entries.pop(key, None)
+        if content is not None:
+            self._size -= sys.getsizeof(content)
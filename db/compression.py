@@ -0,0 +1,47 @@
+import threading
+
+import zstandard
+
+
+class ChapterCompressor:
+    """
+    zstd codec for chapter text.
+    Dictionaries are registered under an integer id, id 0 means "no dictionary".
+    """
+
+    def __init__(self, level=9, dictionary_size=64 * 1024):
+        self.level = level
+        self.dictionary_size = dictionary_size
+        self._compressors = {0: zstandard.ZstdCompressor(level=level)}
+        self._decompressors = {0: zstandard.ZstdDecompressor()}
+        # zstd contexts can't be shared between threads
+        self._lock = threading.Lock()
+
+    def has_dictionary(self, dictionary_id: int) -> bool:
+        return dictionary_id in self._compressors
+
+    def add_dictionary(self, dictionary_id: int, data: bytes):
+        dictionary = zstandard.ZstdCompressionDict(data)
+        with self._lock:
+            self._compressors[dictionary_id] = zstandard.ZstdCompressor(level=self.level, dict_data=dictionary)
+            self._decompressors[dictionary_id] = zstandard.ZstdDecompressor(dict_data=dictionary)
+
+    def train(self, samples: list[str]) -> bytes | None:
+        """
+        Trains a dictionary from chapter samples, returns None when there isn't enough data.
+        """
+        try:
+            dictionary = zstandard.train_dictionary(
+                self.dictionary_size, [sample.encode('utf-8') for sample in samples if sample]
+            )
+        except zstandard.ZstdError:
+            return None
+        return dictionary.as_bytes()
+
+    def compress(self, text: str, dictionary_id: int = 0) -> bytes:
+        with self._lock:
+            return self._compressors[dictionary_id].compress(text.encode('utf-8'))
+
+    def decompress(self, data: bytes, dictionary_id: int = 0) -> str:
+        with self._lock:
+            return self._decompressors[dictionary_id].decompress(data).decode('utf-8')
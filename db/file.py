@@ -1,9 +1,13 @@
-import copy
 import os
-import shutil
 import pickle
+import shutil
+import sqlite3
+import threading
+import time
 
-from logic.entities import Novel, Chapter
+from db.cache import ChapterCache
+from db.compression import ChapterCompressor
+from logic.entities import Novel, Chapter, CatalogEntry
 
 
 def sanitize_filename(filename: str) -> str:
@@ -14,112 +18,527 @@ def sanitize_filename(filename: str) -> str:
 
 
 class SimpleFileDB:
-    def __init__(self, db_location='internal/database'):
+    """
+    Library store backed by a single SQLite file.
+    Chapter writes are batched into one transaction every `batch_size` chapters,
+    call `commit` to force the pending ones to disk.
+    Chapter contents are read on demand through an LRU cache of `cache_size` bytes.
+    Chapters are stored zstd-compressed, once a novel has `train_threshold` chapters
+    a dictionary is trained from them and used for the following ones.
+    Novel metadata is a snapshot plus a journal of changes, compacted into a new
+    snapshot every `compact_threshold` journal entries.
+    The raw HTML of chapter pages can be archived (compressed, by URL) to extract them again offline.
+    """
+
+    def __init__(self, db_location='internal/database', batch_size=50, cache_size=64 * 1024 * 1024,
+                 train_threshold=32, compact_threshold=20):
         self.db_location = db_location
+        self.batch_size = batch_size
+        self.train_threshold = train_threshold
+        self.compact_threshold = compact_threshold
+        self.cache = ChapterCache(cache_size)
+        self.compressor = ChapterCompressor()
+        self._novel_dictionaries = {}
+        # Last persisted metadata and (title, url) chapter list of each novel seen in this session
+        self._saved_metadata = {}
         if not os.path.exists(db_location):
             os.makedirs(db_location, exist_ok=True)
 
-    def _get_file_path(self, key):
-        return os.path.join(self.db_location, key + '.pkl')
+        self._lock = threading.RLock()
+        self._pending = 0
+        self._connection = sqlite3.connect(self.get_store_path(), check_same_thread=False)
+        self._connection.execute('PRAGMA journal_mode=WAL')
+        self._connection.execute('PRAGMA synchronous=NORMAL')
+        self._create_tables()
+        self._import_legacy_files()
+        self._fill_catalog()
+
+    def get_store_path(self):
+        return os.path.join(self.db_location, 'library.sqlite')
+
+    def _create_tables(self):
+        with self._lock, self._connection:
+            self._connection.execute(
+                'CREATE TABLE IF NOT EXISTS novels (title TEXT PRIMARY KEY, metadata BLOB NOT NULL)'
+            )
+            self._connection.execute(
+                'CREATE TABLE IF NOT EXISTS chapters ('
+                'novel_title TEXT NOT NULL, chapter_title TEXT NOT NULL, content TEXT NOT NULL, '
+                'PRIMARY KEY (novel_title, chapter_title))'
+            )
+            columns = [row[1] for row in self._connection.execute('PRAGMA table_info(chapters)')]
+            if 'dictionary_id' not in columns:
+                # NULL: plain text, 0: zstd without dictionary, otherwise the id in `dictionaries`
+                self._connection.execute('ALTER TABLE chapters ADD COLUMN dictionary_id INTEGER')
+            self._connection.execute(
+                'CREATE TABLE IF NOT EXISTS dictionaries ('
+                'id INTEGER PRIMARY KEY AUTOINCREMENT, novel_title TEXT NOT NULL, data BLOB NOT NULL)'
+            )
+            self._connection.execute(
+                'CREATE TABLE IF NOT EXISTS journal ('
+                'id INTEGER PRIMARY KEY AUTOINCREMENT, novel_title TEXT NOT NULL, '
+                'operation TEXT NOT NULL, payload BLOB NOT NULL)'
+            )
+            self._connection.execute('CREATE INDEX IF NOT EXISTS journal_novel ON journal (novel_title, id)')
+            self._connection.execute(
+                'CREATE TABLE IF NOT EXISTS entries (key TEXT PRIMARY KEY, value BLOB NOT NULL)'
+            )
+            self._connection.execute(
+                'CREATE TABLE IF NOT EXISTS pages (url TEXT PRIMARY KEY, html BLOB NOT NULL, fetched_at REAL NOT NULL)'
+            )
+            self._connection.execute(
+                'CREATE TABLE IF NOT EXISTS catalog ('
+                'title TEXT PRIMARY KEY, author TEXT, website TEXT, image TEXT, '
+                'chapter_count INTEGER NOT NULL, downloaded_count INTEGER NOT NULL)'
+            )
+
+    def _import_legacy_files(self):
+        """
+        Moves the old layout (one folder per novel with one pickle per chapter,
+        and one pickle per key) into the store, then removes the old files.
+        """
+        legacy_folders = []
+        legacy_files = []
+        with self._lock, self._connection:
+            for name in os.listdir(self.db_location):
+                path = os.path.join(self.db_location, name)
+                metadata_path = os.path.join(path, 'metadata.pkl')
+                if os.path.isdir(path) and os.path.exists(metadata_path):
+                    with open(metadata_path, 'rb') as file:
+                        novel = pickle.load(file)
+                    if novel is not None:
+                        self._import_legacy_novel(novel, path)
+                    legacy_folders.append(path)
+                elif os.path.isfile(path) and name.endswith('.pkl'):
+                    with open(path, 'rb') as file:
+                        self._connection.execute(
+                            'INSERT OR REPLACE INTO entries (key, value) VALUES (?, ?)',
+                            (name[:-len('.pkl')], pickle.dumps(pickle.load(file))),
+                        )
+                    legacy_files.append(path)
+
+        for path in legacy_folders:
+            shutil.rmtree(path, ignore_errors=True)
+        for path in legacy_files:
+            os.remove(path)
+
+    def _import_legacy_novel(self, novel: Novel, novel_folder_path):
+        rows = []
+        for chapter in novel.chapter_list:
+            chapter_path = os.path.join(novel_folder_path, f"{sanitize_filename(chapter.title)}.pkl")
+            if os.path.exists(chapter_path):
+                with open(chapter_path, 'rb') as file:
+                    content = pickle.load(file)
+                if content:
+                    rows.append((novel.title, chapter.title, content))
+
+        self._connection.executemany(
+            'INSERT OR REPLACE INTO chapters (novel_title, chapter_title, content) VALUES (?, ?, ?)', rows
+        )
+        self._write_snapshot(novel)
+
+    def _fill_catalog(self):
+        """
+        Adds a catalog row for every stored novel that doesn't have one yet.
+        Only metadata is read, chapter bodies are left on disk.
+        """
+        with self._lock, self._connection:
+            rows = self._connection.execute(
+                'SELECT title FROM novels WHERE title NOT IN (SELECT title FROM catalog)'
+            ).fetchall()
+            for (novel_title,) in rows:
+                self._update_catalog(self._read_novel(novel_title))
+
+    def _update_catalog(self, novel: Novel):
+        downloaded_count = self._connection.execute(
+            'SELECT COUNT(*) FROM chapters WHERE novel_title = ?', (novel.title,)
+        ).fetchone()[0]
+        self._connection.execute(
+            'INSERT OR REPLACE INTO catalog '
+            '(title, author, website, image, chapter_count, downloaded_count) VALUES (?, ?, ?, ?, ?, ?)',
+            (novel.title, novel.author, getattr(novel.website, 'value', novel.website), novel.image,
+             len(novel.chapter_list), min(downloaded_count, len(novel.chapter_list))),
+        )
 
-    def _get_novel_folder_path(self, novel_title):
-        sanitized_novel_title = sanitize_filename(novel_title)
-        novel_folder_path = os.path.join(self.db_location, sanitized_novel_title)
-        if not os.path.exists(novel_folder_path):
-            os.makedirs(novel_folder_path)
+    def _get_dictionary_id(self, novel_title: str) -> int:
+        """
+        Returns the dictionary used to compress new chapters of the novel, training it when
+        the novel has enough stored chapters. 0 means no dictionary.
+        """
+        dictionary_id = self._novel_dictionaries.get(novel_title)
+        if dictionary_id:
+            return dictionary_id
 
-        return novel_folder_path
+        row = self._connection.execute(
+            'SELECT MAX(id) FROM dictionaries WHERE novel_title = ?', (novel_title,)
+        ).fetchone()
+        dictionary_id = row[0] or self._train_dictionary(novel_title)
+        self._novel_dictionaries[novel_title] = dictionary_id
+        return dictionary_id
 
-    def _get_chapter_file_path(self, novel_title, chapter: Chapter):
-        sanitized_chapter_title = sanitize_filename(chapter.title)
+    def _train_dictionary(self, novel_title: str, max_samples=200) -> int:
+        stored_count = self._connection.execute(
+            'SELECT COUNT(*) FROM chapters WHERE novel_title = ?', (novel_title,)
+        ).fetchone()[0]
+        if stored_count < self.train_threshold:
+            return 0
 
-        novel_folder_path = self._get_novel_folder_path(novel_title)
-        return os.path.join(novel_folder_path, f"{sanitized_chapter_title}.pkl")
+        rows = self._connection.execute(
+            'SELECT content, dictionary_id FROM chapters WHERE rowid IN ('
+            'SELECT rowid FROM chapters WHERE novel_title = ? ORDER BY RANDOM() LIMIT ?)',
+            (novel_title, max_samples),
+        ).fetchall()
+        data = self.compressor.train([self._decode(content, dictionary_id) for content, dictionary_id in rows])
+        if data is None:
+            return 0
+
+        dictionary_id = self._connection.execute(
+            'INSERT INTO dictionaries (novel_title, data) VALUES (?, ?)', (novel_title, data)
+        ).lastrowid
+        self.compressor.add_dictionary(dictionary_id, data)
+        return dictionary_id
+
+    def _decode(self, content, dictionary_id: int | None) -> str:
+        if dictionary_id is None:
+            return content
+        if not self.compressor.has_dictionary(dictionary_id):
+            with self._lock:
+                row = self._connection.execute(
+                    'SELECT data FROM dictionaries WHERE id = ?', (dictionary_id,)
+                ).fetchone()
+            self.compressor.add_dictionary(dictionary_id, row[0])
+        return self.compressor.decompress(content, dictionary_id)
+
+    def _encode_rows(self, novel_title: str, chapters: list[Chapter], dictionary_id: int = None):
+        if dictionary_id is None:
+            dictionary_id = self._get_dictionary_id(novel_title)
+        return [
+            (novel_title, chapter.title, self.compressor.compress(chapter.content, dictionary_id), dictionary_id)
+            for chapter in chapters
+        ]
+
+    def _mark_pending(self, count=1):
+        self._pending += count
+        if self._pending >= self.batch_size:
+            self.commit()
+
+    def commit(self):
+        with self._lock:
+            self._connection.commit()
+            self._pending = 0
+
+    def close(self):
+        with self._lock:
+            self.commit()
+            self._connection.close()
+
+    def _get_chapter_loader(self, novel_title: str):
+        return lambda chapter: self._read_chapter(novel_title, chapter.title) or ""
+
+    def _read_chapter(self, novel_title: str, chapter_title: str) -> str | None:
+        key = (novel_title, chapter_title)
+        content = self.cache.get(key)
+        if content is None:
+            with self._lock:
+                row = self._connection.execute(
+                    'SELECT content, dictionary_id FROM chapters WHERE novel_title = ? AND chapter_title = ?', key
+                ).fetchone()
+            if row is None:
+                return None
+            content = self._decode(*row)
+            self.cache.put(key, content)
+        return content
 
     def set_chapter(self, novel: Novel, chapter: Chapter):
-        chapter_path = self._get_chapter_file_path(novel.title, chapter)
-        with open(chapter_path, 'wb') as file:
-            pickle.dump(chapter.content, file)
+        self.set_chapters(novel, [chapter])
+
+    def set_chapters(self, novel: Novel, chapters: list[Chapter]):
+        """
+        Stores the chapters and releases their content from memory,
+        it is read back from the store (or the cache) when needed.
+        """
+        with self._lock:
+            self._connection.executemany(
+                'INSERT OR REPLACE INTO chapters (novel_title, chapter_title, content, dictionary_id) '
+                'VALUES (?, ?, ?, ?)',
+                self._encode_rows(novel.title, chapters),
+            )
+            self._mark_pending(len(chapters))
+
+        loader = self._get_chapter_loader(novel.title)
+        for chapter in chapters:
+            self.cache.put((novel.title, chapter.title), chapter.content)
+            chapter.release_content(loader)
+
+    def set_pages(self, pages: list[tuple[str, str]]):
+        """
+        Archives the raw HTML of fetched chapter pages, as (url, html) pairs.
+        """
+        fetched_at = time.time()
+        with self._lock:
+            self._connection.executemany(
+                'INSERT OR REPLACE INTO pages (url, html, fetched_at) VALUES (?, ?, ?)',
+                [(url, self.compressor.compress(html), fetched_at) for url, html in pages],
+            )
+            self._mark_pending(len(pages))
+
+    def get_pages(self, urls: list[str]) -> dict[str, str]:
+        """
+        Returns the archived HTML of the pages at `urls` that have one, by URL.
+        """
+        pages = {}
+        with self._lock:
+            for start in range(0, len(urls), 500):
+                batch = urls[start:start + 500]
+                rows = self._connection.execute(
+                    f'SELECT url, html FROM pages WHERE url IN ({",".join("?" * len(batch))})', batch
+                ).fetchall()
+                pages.update(rows)
+        return {url: self.compressor.decompress(html) for url, html in pages.items()}
 
     def get_chapter_content(self, novel: Novel, chapter: Chapter):
-        chapter_path = self._get_chapter_file_path(novel.title, chapter)
-        try:
-            with open(chapter_path, 'rb') as file:
-                return pickle.load(file)
-        except FileNotFoundError:
-            return None
+        return self._read_chapter(novel.title, chapter.title)
+
+    @staticmethod
+    def _get_metadata(novel: Novel) -> dict:
+        return {
+            'author': novel.author,
+            'url': novel.url,
+            'desc': novel.desc,
+            'image': novel.image,
+            'website': novel.website,
+        }
+
+    def _write_snapshot(self, novel: Novel):
+        metadata = self._get_metadata(novel)
+        chapters = [(chapter.title, chapter.url) for chapter in novel.chapter_list]
+        self._connection.execute(
+            'INSERT OR REPLACE INTO novels (title, metadata) VALUES (?, ?)',
+            (novel.title, pickle.dumps({**metadata, 'chapters': chapters})),
+        )
+        self._connection.execute('DELETE FROM journal WHERE novel_title = ?', (novel.title,))
+        self._saved_metadata[novel.title] = (metadata, chapters)
+
+    def _append_journal(self, novel_title: str, operation: str, payload):
+        self._connection.execute(
+            'INSERT INTO journal (novel_title, operation, payload) VALUES (?, ?, ?)',
+            (novel_title, operation, pickle.dumps(payload)),
+        )
+
+    def _read_novel(self, novel_title: str) -> Novel | None:
+        """
+        Rebuilds the novel metadata from its snapshot and journal, without chapter contents.
+        """
+        with self._lock:
+            row = self._connection.execute('SELECT metadata FROM novels WHERE title = ?', (novel_title,)).fetchone()
+            if row is None:
+                return None
+            journal = self._connection.execute(
+                'SELECT operation, payload FROM journal WHERE novel_title = ? ORDER BY id', (novel_title,)
+            ).fetchall()
 
-    def _get_novel_file_path(self, novel_title):
-        novel_folder_path = self._get_novel_folder_path(novel_title)
-        return os.path.join(novel_folder_path, "metadata.pkl")
+        snapshot = pickle.loads(row[0])
+        if isinstance(snapshot, Novel):
+            # Snapshots written before the journal existed are pickled novels
+            novel = snapshot
+            metadata = self._get_metadata(novel)
+            chapters = [(chapter.title, chapter.url) for chapter in novel.chapter_list]
+        else:
+            chapters = snapshot.pop('chapters')
+            metadata = snapshot
+
+        for operation, payload in journal:
+            payload = pickle.loads(payload)
+            if operation == 'metadata':
+                metadata = payload
+            elif operation == 'extend':
+                chapters = chapters + payload
+
+        self._saved_metadata[novel_title] = (metadata, chapters)
+        return Novel(
+            novel_title,
+            metadata['author'],
+            metadata['url'],
+            metadata['desc'],
+            metadata['website'],
+            metadata['image'],
+            [Chapter(title, url) for title, url in chapters],
+        )
 
     def save_novel(self, novel: Novel):
-        novel_copy = copy.deepcopy(novel)
+        """
+        Persists the metadata changes since the last save: new metadata and appended chapters are
+        journaled, any other change to the chapter list rewrites the snapshot.
+        Downloaded chapters don't need saving, they are tracked by the chapters table.
+        """
+        with self._lock:
+            if novel.title not in self._saved_metadata:
+                self._read_novel(novel.title)
+            saved_metadata, saved_chapters = self._saved_metadata.get(novel.title, (None, None))
+
+            if saved_chapters is not None and len(novel.chapter_list) < len(saved_chapters):
+                self._catch_up_chapters(novel, saved_chapters)
+
+            metadata = self._get_metadata(novel)
+            saved_count = len(saved_chapters) if saved_chapters is not None else 0
+            is_extension = saved_chapters is not None and len(novel.chapter_list) >= saved_count and all(
+                chapter.title == title and chapter.url == url
+                for chapter, (title, url) in zip(novel.chapter_list, saved_chapters)
+            )
+
+            if not is_extension:
+                self._write_snapshot(novel)
+            else:
+                new_chapters = [(chapter.title, chapter.url) for chapter in novel.chapter_list[saved_count:]]
+                if metadata != saved_metadata:
+                    self._append_journal(novel.title, 'metadata', metadata)
+                if new_chapters:
+                    self._append_journal(novel.title, 'extend', new_chapters)
+                self._saved_metadata[novel.title] = (metadata, saved_chapters + new_chapters)
+                self._compact_if_needed(novel)
 
-        # Strip the content from each chapter in the copied novel
-        for chapter in novel_copy.chapter_list:
-            chapter.content = ""
-            chapter.df = []
+            self._update_catalog(novel)
+            self.commit()
 
-        novel_path = self._get_novel_file_path(novel.title)
-        with open(novel_path, 'wb') as file:
-            pickle.dump(novel_copy, file)
+    def _catch_up_chapters(self, novel: Novel, saved_chapters: list[tuple[str, str]]):
+        """
+        Appends the saved chapters missing from a stale copy of the novel, e.g. one loaded before an
+        update check extended the list, so saving it doesn't shrink the chapter list.
+        """
+        if not all(chapter.title == title and chapter.url == url
+                   for chapter, (title, url) in zip(novel.chapter_list, saved_chapters)):
+            return
+
+        stored_chapters = set(self.get_saved_chapters(novel.title))
+        loader = self._get_chapter_loader(novel.title)
+        for title, url in saved_chapters[len(novel.chapter_list):]:
+            chapter = Chapter(title, url)
+            if title in stored_chapters:
+                chapter.release_content(loader)
+                novel.downloaded_set.add(title)
+            novel.chapter_list.append(chapter)
+
+    def _compact_if_needed(self, novel: Novel):
+        journal_size = self._connection.execute(
+            'SELECT COUNT(*) FROM journal WHERE novel_title = ?', (novel.title,)
+        ).fetchone()[0]
+        if journal_size >= self.compact_threshold:
+            self._write_snapshot(novel)
 
     def load_novel(self, novel_title: str) -> Novel | None:
-        novel_path = self._get_novel_file_path(novel_title)
-        with open(novel_path, 'rb') as file:
-            novel = pickle.load(file)
+        novel = self._read_novel(novel_title)
         if novel is None:
             return None
 
         novel.downloaded_set = set()
-        # chapters_files = self.get_saved_chapters(novel_title)
+        saved_chapters = set(self.get_saved_chapters(novel_title))
+        loader = self._get_chapter_loader(novel_title)
 
-        # Populate chapter content from individual chapter files
+        # Stored chapters are marked as downloaded, their content is loaded lazily
         for chapter in novel.chapter_list:
-            content = self.get_chapter_content(novel, chapter)
-            if content:
-                chapter.content = content
+            if chapter.title in saved_chapters:
+                chapter.release_content(loader)
                 novel.downloaded_set.add(chapter.title)
 
-        # Sync chapters
-        self.save_novel(novel)
+        with self._lock:
+            self._update_catalog(novel)
+            self.commit()
 
         return novel
 
     def delete_novel(self, novel_title):
-        novel_path = self._get_novel_folder_path(novel_title)
-        try:
-            shutil.rmtree(novel_path)
-            return True
-        except FileNotFoundError:
-            return False
+        novel = self._read_novel(novel_title)
+        urls = [chapter.url for chapter in novel.chapter_list] if novel else []
+        with self._lock, self._connection:
+            deleted = self._connection.execute('DELETE FROM novels WHERE title = ?', (novel_title,)).rowcount
+            self._connection.execute('DELETE FROM catalog WHERE title = ?', (novel_title,))
+            self._connection.execute('DELETE FROM journal WHERE novel_title = ?', (novel_title,))
+            self._connection.execute('DELETE FROM chapters WHERE novel_title = ?', (novel_title,))
+            self._connection.execute('DELETE FROM dictionaries WHERE novel_title = ?', (novel_title,))
+            self._connection.executemany('DELETE FROM pages WHERE url = ?', [(url,) for url in urls])
+            self._pending = 0
+        self._novel_dictionaries.pop(novel_title, None)
+        self._saved_metadata.pop(novel_title, None)
+        self.cache.discard_novel(novel_title)
+        return deleted > 0
 
     def set(self, key, obj):
-        with open(self._get_file_path(key), 'wb') as file:
-            pickle.dump(obj, file)
+        with self._lock, self._connection:
+            self._connection.execute(
+                'INSERT OR REPLACE INTO entries (key, value) VALUES (?, ?)', (key, pickle.dumps(obj))
+            )
+            self._pending = 0
 
     def get(self, key):
-        try:
-            with open(self._get_file_path(key), 'rb') as file:
-                return pickle.load(file)
-        except FileNotFoundError:
-            return None
+        with self._lock:
+            row = self._connection.execute('SELECT value FROM entries WHERE key = ?', (key,)).fetchone()
+        return pickle.loads(row[0]) if row else None
 
     def delete(self, key):
-        try:
-            os.remove(self._get_file_path(key))
-        except FileNotFoundError:
-            pass
+        with self._lock, self._connection:
+            self._connection.execute('DELETE FROM entries WHERE key = ?', (key,))
+            self._pending = 0
 
     def keys(self):
-        return [file for file in os.listdir(self.db_location)]
+        with self._lock:
+            return [row[0] for row in self._connection.execute('SELECT title FROM novels ORDER BY title')]
+
+    def get_all(self):
+        return [self.load_novel(key) for key in self.keys()]
+
+    def get_chapters_content(self, novel_title: str) -> dict[str, str]:
+        """
+        Reads every stored chapter of the novel in a single query, for exports that need all of them.
+        """
+        with self._lock:
+            rows = self._connection.execute(
+                'SELECT chapter_title, content, dictionary_id FROM chapters WHERE novel_title = ?', (novel_title,)
+            ).fetchall()
+        return {title: self._decode(content, dictionary_id) for title, content, dictionary_id in rows}
 
     def get_saved_chapters(self, novel_name: str) -> list[str]:
-        files = [file for file in os.listdir(self._get_novel_folder_path(novel_name))]
-        chapters = [file for file in files if file.endswith(".pkl") and file != "metadata.pkl"]
+        with self._lock:
+            rows = self._connection.execute(
+                'SELECT chapter_title FROM chapters WHERE novel_title = ?', (novel_name,)
+            ).fetchall()
+        return [row[0] for row in rows]
 
-        return chapters
+    def get_catalog(self) -> list[CatalogEntry]:
+        with self._lock:
+            rows = self._connection.execute(
+                'SELECT title, author, website, image, chapter_count, downloaded_count FROM catalog'
+            ).fetchall()
+        return [CatalogEntry(*row) for row in rows]
 
-    def get_all(self):
-        return [self.load_novel(key) for key in self.keys()]
+    def compress_library(self):
+        """
+        Re-compresses every stored chapter with a dictionary freshly trained for its novel,
+        including chapters stored uncompressed by older versions, then reclaims the freed space.
+        """
+        for novel_title in self.keys():
+            with self._lock, self._connection:
+                rows = self._connection.execute(
+                    'SELECT chapter_title, content, dictionary_id FROM chapters WHERE novel_title = ?', (novel_title,)
+                ).fetchall()
+                chapters = []
+                for chapter_title, content, dictionary_id in rows:
+                    chapter = Chapter(chapter_title, None)
+                    chapter.content = self._decode(content, dictionary_id)
+                    chapters.append(chapter)
+
+                dictionary_id = self._train_dictionary(novel_title)
+                self._novel_dictionaries[novel_title] = dictionary_id
+                # The fresh id is passed explicitly, a failed training (0) must not fall back to an old dictionary
+                encoded = self._encode_rows(novel_title, chapters, dictionary_id)
+                self._connection.executemany(
+                    'UPDATE chapters SET content = ?, dictionary_id = ? WHERE novel_title = ? AND chapter_title = ?',
+                    [(content, used_id, title, chapter_title) for title, chapter_title, content, used_id in encoded],
+                )
+                self._connection.execute(
+                    'DELETE FROM dictionaries WHERE novel_title = ? AND id != ?', (novel_title, dictionary_id)
+                )
+                self._pending = 0
+            print(f"Compressed {len(chapters)} chapters of '{novel_title}'")
+
+        with self._lock:
+            self._connection.execute('VACUUM')
@@ -0,0 +1,69 @@
+import sqlite3
+import threading
+import time
+
+import zstandard
+
+
+class CachedResponse:
+    def __init__(self, body: bytes, encoding: str | None, etag: str | None, last_modified: str | None,
+                 fetched_at: float):
+        self.body = body
+        self.encoding = encoding
+        self.etag = etag
+        self.last_modified = last_modified
+        self.fetched_at = fetched_at
+
+    def age(self) -> float:
+        return time.time() - self.fetched_at
+
+
+class HttpCache:
+    """
+    On-disk cache of HTTP responses by URL, with the validators needed to revalidate them.
+    It lives in its own file so it can be deleted at any time, entries not used for `max_age`
+    seconds are dropped when it opens.
+    """
+
+    def __init__(self, path: str, max_age=30 * 24 * 60 * 60):
+        self._lock = threading.Lock()
+        self._compressor = zstandard.ZstdCompressor(level=3)
+        self._decompressor = zstandard.ZstdDecompressor()
+        self._connection = sqlite3.connect(path, check_same_thread=False)
+        with self._lock, self._connection:
+            self._connection.execute('PRAGMA journal_mode=WAL')
+            self._connection.execute(
+                'CREATE TABLE IF NOT EXISTS responses ('
+                'url TEXT PRIMARY KEY, body BLOB NOT NULL, encoding TEXT, etag TEXT, last_modified TEXT, '
+                'fetched_at REAL NOT NULL)'
+            )
+            self._connection.execute('DELETE FROM responses WHERE fetched_at < ?', (time.time() - max_age,))
+
+    def get(self, url: str) -> CachedResponse | None:
+        with self._lock:
+            row = self._connection.execute(
+                'SELECT body, encoding, etag, last_modified, fetched_at FROM responses WHERE url = ?', (url,)
+            ).fetchone()
+            if row is None:
+                return None
+            body = self._decompressor.decompress(row[0])
+        return CachedResponse(body, *row[1:])
+
+    def put(self, url: str, body: bytes, encoding: str = None, etag: str = None, last_modified: str = None):
+        with self._lock, self._connection:
+            self._connection.execute(
+                'INSERT OR REPLACE INTO responses (url, body, encoding, etag, last_modified, fetched_at) '
+                'VALUES (?, ?, ?, ?, ?, ?)',
+                (url, self._compressor.compress(body), encoding, etag, last_modified, time.time()),
+            )
+
+    def touch(self, url: str):
+        """
+        Marks the cached response as fresh again, after the server confirmed it didn't change.
+        """
+        with self._lock, self._connection:
+            self._connection.execute('UPDATE responses SET fetched_at = ? WHERE url = ?', (time.time(), url))
+
+    def close(self):
+        with self._lock:
+            self._connection.close()
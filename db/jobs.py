@@ -0,0 +1,131 @@
+import sqlite3
+import threading
+import time
+
+from logic.entities import DownloadJob
+
+
+class JobQueue:
+    """
+    Durable queue of novel downloads, stored next to the library.
+    Jobs left running by a crash are queued again when the queue opens. Progress is checkpointed
+    as chapters are written, the chapters themselves are the checkpoints a resumed job starts from.
+    A job added again while it runs is flagged `pending_requeue` and queued again once it finishes.
+    """
+
+    def __init__(self, store_path: str, max_retries=3):
+        self.max_retries = max_retries
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(store_path, check_same_thread=False)
+        with self._lock, self._connection:
+            self._connection.execute(
+                'CREATE TABLE IF NOT EXISTS jobs ('
+                'novel_title TEXT PRIMARY KEY, status TEXT NOT NULL, priority INTEGER NOT NULL, '
+                'retries INTEGER NOT NULL, downloaded INTEGER NOT NULL, total INTEGER NOT NULL, '
+                'error TEXT, created_at REAL NOT NULL, updated_at REAL NOT NULL)'
+            )
+            columns = [row[1] for row in self._connection.execute('PRAGMA table_info(jobs)')]
+            if 'pending_requeue' not in columns:
+                self._connection.execute('ALTER TABLE jobs ADD COLUMN pending_requeue INTEGER NOT NULL DEFAULT 0')
+            self._connection.execute(
+                "UPDATE jobs SET status = 'queued', pending_requeue = 0 WHERE status = 'running'"
+            )
+            self._paused = {
+                row[0] for row in self._connection.execute("SELECT novel_title FROM jobs WHERE status = 'paused'")
+            }
+
+    def _execute(self, query: str, parameters=()):
+        with self._lock, self._connection:
+            return self._connection.execute(query, parameters)
+
+    def add(self, novel_title: str, priority=0, total: int = None):
+        """
+        Queues the novel, a finished or failed job is queued again and a queued one keeps the higher priority.
+        A running job is queued again when it finishes, it may have started before the new chapters existed.
+        """
+        now = time.time()
+        self._execute(
+            "INSERT INTO jobs (novel_title, status, priority, retries, downloaded, total, created_at, updated_at) "
+            "VALUES (?, 'queued', ?, 0, 0, COALESCE(?, 0), ?, ?) "
+            "ON CONFLICT (novel_title) DO UPDATE SET "
+            "status = CASE WHEN status IN ('done', 'failed') THEN 'queued' ELSE status END, "
+            "retries = CASE WHEN status IN ('done', 'failed') THEN 0 ELSE retries END, "
+            "pending_requeue = CASE WHEN status = 'running' THEN 1 ELSE pending_requeue END, "
+            "priority = MAX(priority, excluded.priority), total = COALESCE(?, jobs.total), "
+            "updated_at = excluded.updated_at",
+            (novel_title, priority, total, now, now, total),
+        )
+
+    def next(self) -> str | None:
+        row = self._execute(
+            "SELECT novel_title FROM jobs WHERE status = 'queued' ORDER BY priority DESC, created_at LIMIT 1"
+        ).fetchone()
+        return row[0] if row else None
+
+    def start(self, novel_title: str, downloaded: int, total: int):
+        self._execute(
+            "UPDATE jobs SET status = 'running', downloaded = ?, total = ?, error = NULL, updated_at = ? "
+            "WHERE novel_title = ?",
+            (downloaded, total, time.time(), novel_title),
+        )
+
+    def checkpoint(self, novel_title: str, chapters: int):
+        self._execute(
+            "UPDATE jobs SET downloaded = downloaded + ?, updated_at = ? WHERE novel_title = ?",
+            (chapters, time.time(), novel_title),
+        )
+
+    def finish(self, novel_title: str):
+        self._execute(
+            "UPDATE jobs SET status = CASE WHEN status = 'paused' THEN status "
+            "WHEN pending_requeue THEN 'queued' ELSE 'done' END, pending_requeue = 0, updated_at = ? "
+            "WHERE novel_title = ?",
+            (time.time(), novel_title),
+        )
+
+    def fail(self, novel_title: str, error: str):
+        """
+        Counts a failed attempt, the job is queued again until it reaches `max_retries`.
+        """
+        self._execute(
+            "UPDATE jobs SET retries = retries + 1, error = ?, updated_at = ?, pending_requeue = 0, "
+            "status = CASE WHEN status = 'paused' THEN status WHEN retries + 1 >= ? THEN 'failed' ELSE 'queued' END "
+            "WHERE novel_title = ?",
+            (error, time.time(), self.max_retries, novel_title),
+        )
+
+    def pause(self, novel_title: str):
+        """
+        Pauses a queued or running job, missing and finished jobs have nothing to pause.
+        """
+        cursor = self._execute(
+            "UPDATE jobs SET status = 'paused', updated_at = ? WHERE novel_title = ? AND status != 'done'",
+            (time.time(), novel_title),
+        )
+        if cursor.rowcount:
+            self._paused.add(novel_title)
+
+    def resume(self, novel_title: str):
+        self._paused.discard(novel_title)
+        self._execute(
+            "UPDATE jobs SET status = 'queued', retries = 0, updated_at = ? WHERE novel_title = ? AND status = 'paused'",
+            (time.time(), novel_title),
+        )
+
+    def is_paused(self, novel_title: str) -> bool:
+        return novel_title in self._paused
+
+    def remove(self, novel_title: str):
+        self._paused.discard(novel_title)
+        self._execute("DELETE FROM jobs WHERE novel_title = ?", (novel_title,))
+
+    def get_jobs(self) -> list[DownloadJob]:
+        rows = self._execute(
+            "SELECT novel_title, status, priority, retries, downloaded, total, error FROM jobs "
+            "ORDER BY priority DESC, created_at"
+        ).fetchall()
+        return [DownloadJob(*row) for row in rows]
+
+    def close(self):
+        with self._lock:
+            self._connection.close()
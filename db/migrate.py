@@ -0,0 +1,17 @@
+from db.file import SimpleFileDB
+
+
+def main() -> None:
+    """
+    Converts the library to the current storage format: old pickle folders are imported
+    when the store opens, then every chapter is compressed with its novel's dictionary.
+    """
+    db = SimpleFileDB()
+    try:
+        db.compress_library()
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
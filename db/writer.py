@@ -0,0 +1,95 @@
+import queue
+import threading
+import traceback
+from typing import Callable
+
+from db.file import SimpleFileDB
+from logic.entities import Novel, Chapter
+
+
+class ChapterWriter:
+    """
+    Persists downloaded chapters from a background thread.
+    `put` only blocks when `max_pending` chapters are already waiting, queued chapters are
+    written in batches of up to `batch_size`, each batch committed as a single transaction.
+    `on_written(novel, chapters)` is called after each commit with the chapters it stored.
+    Archived pages from `put_page` are written in the same batches.
+    """
+
+    def __init__(self, db: SimpleFileDB, max_pending=200, batch_size=50,
+                 on_written: Callable[[Novel, list[Chapter]], None] = None):
+        self.db = db
+        self.batch_size = batch_size
+        self.on_written = on_written
+        self._queue = queue.Queue(maxsize=max_pending)
+        self._error = None
+        self._thread = threading.Thread(target=self._run, name='chapter-writer', daemon=True)
+        self._thread.start()
+
+    def put(self, novel: Novel, chapter: Chapter):
+        self._queue.put((novel, chapter))
+
+    def put_page(self, url: str, html: str):
+        self._queue.put((url, html))
+
+    def flush(self):
+        """
+        Waits until every queued chapter is on disk.
+        """
+        self._queue.join()
+        if self._error:
+            error, self._error = self._error, None
+            raise error
+
+    def close(self):
+        self._queue.put(None)
+        self._thread.join()
+
+    def _run(self):
+        while True:
+            item = self._queue.get()
+            if item is None:
+                self._queue.task_done()
+                return
+
+            batch = [item]
+            while len(batch) < self.batch_size:
+                try:
+                    item = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if item is None:
+                    # Put the sentinel back so the loop ends after this batch
+                    self._queue.task_done()
+                    self._queue.put(None)
+                    break
+                batch.append(item)
+
+            try:
+                self._write(batch)
+            except Exception as ex:
+                traceback.print_exc()
+                self._error = ex
+            finally:
+                for _ in batch:
+                    self._queue.task_done()
+
+    def _write(self, batch: list[tuple[Novel, Chapter] | tuple[str, str]]):
+        chapters_by_novel = {}
+        pages = []
+        for item in batch:
+            if isinstance(item[0], str):
+                pages.append(item)
+            else:
+                novel, chapter = item
+                chapters_by_novel.setdefault(novel.title, (novel, []))[1].append(chapter)
+
+        for novel, chapters in chapters_by_novel.values():
+            self.db.set_chapters(novel, chapters)
+        if pages:
+            self.db.set_pages(pages)
+        self.db.commit()
+
+        if self.on_written:
+            for novel, chapters in chapters_by_novel.values():
+                self.on_written(novel, chapters)
@@ -1,31 +1,71 @@
+import os
+
 from db.file import SimpleFileDB
+from db.http_cache import HttpCache
+from db.jobs import JobQueue
+from db.writer import ChapterWriter
+from logic.async_downloader import AsyncChapterDownloader
 from logic.filter import ContentFilter
+from logic.http_client import HttpClient
 from logic.novel_downloader import NovelDownloader
-from logic.selenium_web import ScrapperSelenium, get_driver
+from logic.rate_limiter import RateLimiter
+from logic.selenium_web import ScrapperSelenium, ScrapperPool, LazyDriver, get_driver
 from logic.websites import Website
 from logic.websites.lightnovelcave import LightNovelCave
 from logic.websites.novel_bin import NovelBin
 from logic.websites.novelcool import NovelCool
 from logic.websites.webnovel import WebNovel
-from ui import NovelUI
 
 
-def build_app(use_undetected, max_per_volume, is_chromium):
+def build_websites(driver, http_client):
+    return {
+        Website.Webnovel: WebNovel(driver, http_client),
+        Website.NovelBin: NovelBin(driver, http_client),
+        Website.LightNovelCave: LightNovelCave(driver, http_client),
+        Website.NovelCool: NovelCool(driver, http_client),
+    }
+
+
+def build_downloader(use_undetected, max_per_volume, is_chromium, workers=1, website_limits=None,
+                     update_interval=None, headless=False, archive_pages=False) -> NovelDownloader:
     db = SimpleFileDB()
+    jobs = JobQueue(db.get_store_path())
+    writer = ChapterWriter(db, on_written=lambda novel, chapters: jobs.checkpoint(novel.title, len(chapters)))
+    rate_limiter = RateLimiter(db.get('rate_limits'))
+    http_cache = HttpCache(os.path.join(db.db_location, 'http_cache.sqlite'))
+    http_client = HttpClient(pool_size=max(10, workers * 2), rate_limiter=rate_limiter, cache=http_cache)
 
-    driver = get_driver(use_undetected, is_chromium)
-    driver.stop_client()
-    websites = {
-        Website.Webnovel: WebNovel(driver),
-        Website.NovelBin: NovelBin(driver),
-        Website.LightNovelCave: LightNovelCave(driver),
-        Website.NovelCool: NovelCool(driver),
-    }
-    scrapper = ScrapperSelenium(db, driver, websites, use_undetected)
-    downloader = NovelDownloader(db, scrapper, max_per_volume)
-    filter = ContentFilter()
+    def build_worker():
+        worker_driver = LazyDriver(lambda: get_driver(use_undetected, is_chromium, headless))
+        return ScrapperSelenium(
+            db, worker_driver, build_websites(worker_driver, http_client), use_undetected, writer,
+            rate_limiter=rate_limiter, archive_pages=archive_pages,
+        )
 
-    app = NovelUI(downloader, filter)
-    driver.start_client()
+    # Downloads and update checks run on the pool, the main browser only serves searches
+    pool = ScrapperPool(build_worker, workers, website_limits)
+
+    driver = LazyDriver(lambda: get_driver(use_undetected, is_chromium, headless))
+    scrapper = ScrapperSelenium(
+        db, driver, build_websites(driver, http_client), use_undetected, writer, pool, http_client,
+        AsyncChapterDownloader(rate_limiter=rate_limiter), rate_limiter, archive_pages=archive_pages,
+    )
+    downloader = NovelDownloader(db, scrapper, max_per_volume, jobs)
+    downloader.start_job_worker()
+    if update_interval:
+        downloader.start_update_sweeps(update_interval, workers)
+
+    return downloader
+
+
+def build_app(use_undetected, max_per_volume, is_chromium, workers=1, website_limits=None, update_interval=None,
+              headless=False, archive_pages=False):
+    # tkinter is only needed by the GUI, the headless entry point doesn't import it
+    from ui import NovelUI
+
+    downloader = build_downloader(
+        use_undetected, max_per_volume, is_chromium, workers, website_limits, update_interval, headless, archive_pages
+    )
+    filter = ContentFilter()
 
-    return app
+    return NovelUI(downloader, filter)
@@ -0,0 +1,93 @@
+import asyncio
+from typing import Callable, List
+from urllib.parse import urlparse
+
+import aiohttp
+
+from utils import html as html_utils
+from .entities import Chapter
+from .http_client import DEFAULT_USER_AGENT
+from .rate_limiter import RateLimiter
+from .websites import BasicWebsite
+
+
+class AsyncChapterDownloader:
+    """
+    Downloads the chapters of websites in HTTP mode from a single thread with asyncio,
+    keeping up to `per_domain` requests in flight for each domain, paced by `rate_limiter`.
+    """
+
+    def __init__(self, per_domain=8, timeout=15, user_agent=DEFAULT_USER_AGENT, rate_limiter: RateLimiter = None):
+        self.per_domain = per_domain
+        self.rate_limiter = rate_limiter if rate_limiter else RateLimiter()
+        self.timeout = timeout
+        self.headers = {
+            'User-Agent': user_agent,
+            'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8',
+            'Accept-Language': 'en-US,en;q=0.9',
+        }
+
+    def download(self, website: BasicWebsite, chapters: List[Chapter],
+                 on_chapter: Callable[[Chapter, str], None],
+                 is_cancelled: Callable[[], bool] = None,
+                 on_page: Callable[[str, str], None] = None) -> List[Chapter]:
+        """
+        Calls `on_chapter` for every chapter as soon as it is parsed, in completion order,
+        and `on_page` with the URL and HTML of every page that was fetched.
+        Returns the chapters that couldn't be downloaded this way, in their original order.
+        Once `is_cancelled` returns True the remaining chapters are skipped.
+        This is a blocking function.
+        """
+        failed = asyncio.run(self._download_all(website, chapters, on_chapter, is_cancelled, on_page))
+        return [chapter for chapter in chapters if id(chapter) in failed]
+
+    async def _download_all(self, website: BasicWebsite, chapters: List[Chapter],
+                            on_chapter: Callable[[Chapter, str], None],
+                            is_cancelled: Callable[[], bool] = None,
+                            on_page: Callable[[str, str], None] = None) -> set[int]:
+        semaphores = {}
+        failed = set()
+        connector = aiohttp.TCPConnector(limit_per_host=self.per_domain)
+        timeout = aiohttp.ClientTimeout(total=self.timeout)
+
+        async with aiohttp.ClientSession(headers=self.headers, connector=connector, timeout=timeout) as session:
+            async def download_chapter(chapter: Chapter):
+                domain = urlparse(chapter.url).netloc
+                semaphore = semaphores.setdefault(domain, asyncio.Semaphore(self.per_domain))
+                async with semaphore:
+                    if is_cancelled and is_cancelled():
+                        failed.add(id(chapter))
+                        return
+                    await self.rate_limiter.acquire_async(chapter.url)
+                    html = await self._fetch(session, chapter.url)
+
+                if html and not html_utils.is_challenge_page(html):
+                    self.rate_limiter.success(chapter.url)
+                    if on_page:
+                        on_page(chapter.url, html)
+                    content = website.parse_chapter_content(html)
+                else:
+                    self.rate_limiter.failure(chapter.url)
+                    content = None
+
+                if content:
+                    print(f"Loaded [{chapter.title}] {chapter.url}")
+                    on_chapter(chapter, content)
+                else:
+                    failed.add(id(chapter))
+
+            await asyncio.gather(*(download_chapter(chapter) for chapter in chapters))
+
+        return failed
+
+    @staticmethod
+    async def _fetch(session: aiohttp.ClientSession, url: str) -> str | None:
+        try:
+            async with session.get(url) as response:
+                if response.status != 200:
+                    print("Error fetching", url, response.status)
+                    return None
+                return await response.text()
+        except (aiohttp.ClientError, asyncio.TimeoutError) as ex:
+            print("Error fetching", url, ex)
+            return None
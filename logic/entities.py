@@ -3,19 +3,55 @@ import os
 from utils import constants
 from db import img, file as filemanager
 
-import pandas as pd
 from typing import List
 
 class Chapter:
     def __init__(self, title, url):
         self.title = title
         self.url = url
-        self.content = ""
-        self.df = pd.DataFrame()
+        self.loader = None
+        self._content = ""
+        # Sentence predictions of the ML export flow, set when the model runs
+        self.df = None
 
     def __str__(self):
         return self.title
 
+    @property
+    def content(self) -> str:
+        if self._content is None:
+            return self.loader(self) if self.loader else ""
+        return self._content
+
+    @content.setter
+    def content(self, content: str):
+        self._content = content
+
+    def is_released(self) -> bool:
+        """
+        Tells whether the content is left to the loader, i.e. it wasn't changed in memory.
+        """
+        return self._content is None
+
+    def release_content(self, loader):
+        """
+        Drops the content kept in memory, later reads are served by `loader`.
+        """
+        self.loader = loader
+        self._content = None
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state['loader'] = None
+        return state
+
+    def __setstate__(self, state):
+        # Chapters pickled before content became lazy store it as a plain attribute
+        if 'content' in state:
+            state['_content'] = state.pop('content')
+        state.setdefault('loader', None)
+        self.__dict__.update(state)
+
 
 class Novel:
     def __init__(self, title: str, author: str, url: str, desc: str,
@@ -51,7 +87,11 @@ class Novel:
     def is_new(self):
         return len(self.get_chapters_to_download()) == len(self.chapter_list)
 
-    def write_to_txt(self, max_per_chapter=300):
+    def write_to_txt(self, max_per_chapter=300, stored_contents: dict[str, str] = None):
+        """
+        `stored_contents` are the stored chapters read in bulk by title, they are used for the chapters
+        not changed in memory instead of loading them one at a time.
+        """
         novel_title = filemanager.sanitize_filename(self.title)
         output_folder = os.path.join('Novels', novel_title)
         os.makedirs(output_folder, exist_ok=True)
@@ -71,6 +111,47 @@ class Novel:
                 file_path = os.path.join(output_folder, f'{novel_title} {volume_count}.txt')
                 file = open(file_path, "w+", encoding="utf-8")
             file.write(f'\n--------\n{chapter.title}\n')
-            file.write('\n' + chapter.content + '\n')
+            content = stored_contents.get(chapter.title) if stored_contents and chapter.is_released() else None
+            file.write('\n' + (content or chapter.content) + '\n')
 
         file.close()
+
+
+class CatalogEntry:
+    """
+    Summary of a stored novel, enough to list and sort the library without loading its chapters.
+    """
+    def __init__(self, title: str, author: str, website: str, image: str, chapter_count: int, downloaded_count: int):
+        self.title = title
+        self.author = author
+        self.website = website
+        self.image = image
+        self.chapter_count = chapter_count
+        self.downloaded_count = downloaded_count
+
+    def __str__(self):
+        return f"'{self.title}' by {self.author}."
+
+    def get_image_path(self):
+        return img.get_image_path(self.image)
+
+    def is_downloaded(self):
+        return self.downloaded_count >= self.chapter_count
+
+
+class DownloadJob:
+    """
+    State of a queued novel download.
+    """
+    def __init__(self, novel_title: str, status: str, priority: int, retries: int, downloaded: int, total: int,
+                 error: str = None):
+        self.novel_title = novel_title
+        self.status = status
+        self.priority = priority
+        self.retries = retries
+        self.downloaded = downloaded
+        self.total = total
+        self.error = error
+
+    def __str__(self):
+        return f"'{self.novel_title}' {self.status} ({self.downloaded}/{self.total})"
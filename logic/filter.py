@@ -37,7 +37,9 @@ class ContentFilter:
                 else:
                     filtered_lines.append(line)
 
-            novel.chapter_list[i].content = '\n'.join(filtered_lines)
+            # Unchanged chapters keep being served from the store instead of being pinned in memory
+            if len(filtered_lines) != len(chapter_lines):
+                novel.chapter_list[i].content = '\n'.join(filtered_lines)
 
             start_len = current_len
 
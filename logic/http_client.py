@@ -0,0 +1,106 @@
+import time
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from db.http_cache import HttpCache, CachedResponse
+from .rate_limiter import RateLimiter
+
+DEFAULT_USER_AGENT = (
+    'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) '
+    'Chrome/120.0.0.0 Safari/537.36'
+)
+# How long cached responses are used without asking the server, novel pages change when chapters are released
+PAGE_CACHE_TTL = 60 * 60
+COVER_CACHE_TTL = 7 * 24 * 60 * 60
+
+
+class HttpClient:
+    """
+    Keep-alive HTTP client shared by every website, connections are pooled per host
+    and requests are paced by `rate_limiter`.
+    Requests made with a `cache_ttl` go through `cache`: a cached response younger than the TTL is
+    used as is, an older one is revalidated with its ETag / Last-Modified.
+    """
+
+    def __init__(self, pool_size=10, timeout=15, user_agent=DEFAULT_USER_AGENT, rate_limiter: RateLimiter = None,
+                 cache: HttpCache = None):
+        self.timeout = timeout
+        self.cache = cache
+        self.rate_limiter = rate_limiter if rate_limiter else RateLimiter()
+        self.session = requests.Session()
+        self.session.headers.update({
+            'User-Agent': user_agent,
+            'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8',
+            'Accept-Language': 'en-US,en;q=0.9',
+        })
+        retry = Retry(total=2, backoff_factor=0.5, status_forcelist=[502, 503, 504])
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=retry)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+
+    def get(self, url: str, headers: dict = None) -> requests.Response | None:
+        """
+        Returns the response when it is a 200 or a 304 (only possible with conditional `headers`).
+        This is a blocking function.
+        """
+        self.rate_limiter.acquire(url)
+        try:
+            response = self.session.get(url, headers=headers, timeout=self.timeout)
+        except requests.RequestException as ex:
+            print("Error fetching", url, ex)
+            self.rate_limiter.failure(url)
+            return None
+        if response.status_code not in (200, 304):
+            print("Error fetching", url, response.status_code)
+            self.rate_limiter.failure(url)
+            return None
+        self.rate_limiter.success(url)
+        return response
+
+    def _get_cached(self, url: str, cache_ttl: float) -> CachedResponse | None:
+        cached = self.cache.get(url)
+        if cached and cached.age() < cache_ttl:
+            return cached
+
+        headers = {}
+        if cached and cached.etag:
+            headers['If-None-Match'] = cached.etag
+        if cached and cached.last_modified:
+            headers['If-Modified-Since'] = cached.last_modified
+        response = self.get(url, headers)
+        if response is None:
+            # A stale copy is better than nothing
+            return cached
+        if response.status_code == 304 and cached:
+            self.cache.touch(url)
+            return cached
+
+        cached = CachedResponse(
+            response.content, response.encoding, response.headers.get('ETag'),
+            response.headers.get('Last-Modified'), time.time(),
+        )
+        self.cache.put(url, cached.body, cached.encoding, cached.etag, cached.last_modified)
+        return cached
+
+    def get_content(self, url: str, cache_ttl: float = None) -> bytes | None:
+        if cache_ttl is not None and self.cache:
+            cached = self._get_cached(url, cache_ttl)
+            return cached.body if cached else None
+
+        response = self.get(url)
+        return response.content if response else None
+
+    def get_text(self, url: str, cache_ttl: float = None) -> str | None:
+        if cache_ttl is not None and self.cache:
+            cached = self._get_cached(url, cache_ttl)
+            return cached.body.decode(cached.encoding or 'utf-8', errors='replace') if cached else None
+
+        response = self.get(url)
+        return response.text if response else None
+
+    def close(self):
+        self.session.close()
+        if self.cache:
+            self.cache.close()
@@ -1,20 +1,43 @@
+import threading
+import traceback
 from typing import List
 
 from db.file import SimpleFileDB
-from .entities import Novel
+from db.jobs import JobQueue
+from .entities import Novel, CatalogEntry, Chapter
 from .selenium_web import ScrapperSelenium
+from .update_scheduler import UpdateScheduler
 
 
 class NovelDownloader:
-    def __init__(self, db: SimpleFileDB, scrapper: ScrapperSelenium, max_per_volume):
+    def __init__(self, db: SimpleFileDB, scrapper: ScrapperSelenium, max_per_volume, jobs: JobQueue = None):
         self.scrapper = scrapper
         self.max_per_volume = max_per_volume
         self.db = db
+        self.jobs = jobs if jobs else JobQueue(db.get_store_path())
+        self.scheduler = None
+        self._active_downloads = set()
+        # Notified when a download ends, close waits for all of them
+        self._active_lock = threading.Condition()
+        self._stop = threading.Event()
+        self._jobs_queued = threading.Event()
+        self._job_thread = None
 
         self.novels = self._get_all_novels()
 
     def search_novel(self, novel_url, website_name: str) -> List[Novel]:
         novel = self.scrapper.search_basic_novel_info(novel_url, website_name)
+        saved_novel = self.db.load_novel(novel.title) if novel else None
+        if saved_novel and saved_novel.url == novel.url:
+            # Searching a novel of the library only needs the chapters published since,
+            # the metadata is refreshed from the search
+            saved_novel.author = novel.author or saved_novel.author
+            saved_novel.desc = novel.desc or saved_novel.desc
+            saved_novel.image = novel.image or saved_novel.image
+            self.check_new_chapters(saved_novel)
+            self.db.save_novel(saved_novel)
+            return [saved_novel]
+
         novel.chapter_list = self.scrapper.get_chapter_list(novel)
 
         self.db.save_novel(novel)
@@ -24,25 +47,148 @@ class NovelDownloader:
     def sync_novels(self):
         self.novels = self._get_all_novels()
 
-    def _get_all_novels(self) -> List[Novel]:
-        novels = self.db.get_all()
+    def _get_all_novels(self) -> List[CatalogEntry]:
+        novels = self.db.get_catalog()
         return sorted(novels, key=lambda novel: (novel.is_downloaded(), novel.title))
 
+    def open_novel(self, novel_title: str) -> Novel | None:
+        return self.db.load_novel(novel_title)
+
+    def check_new_chapters(self, novel: Novel) -> List[Chapter]:
+        """
+        Appends the chapters published since the last search or check to the novel.
+        """
+        new_chapters = self.scrapper.get_new_chapters(novel)
+        if new_chapters:
+            novel.chapter_list.extend(new_chapters)
+            self.db.save_novel(novel)
+
+        return new_chapters
+
     def download_novel(self, novel: Novel):
+        """
+        Downloads the missing chapters as a job of the queue, every written chapter is a checkpoint
+        so an interrupted download continues from the last one.
+        Returns False when it didn't finish, or the novel is already being downloaded.
+        """
+        with self._active_lock:
+            if self._stop.is_set():
+                return False
+            if novel.title in self._active_downloads:
+                print(f"'{novel.title}' is already being downloaded")
+                return False
+            self._active_downloads.add(novel.title)
+
         try:
-            self.scrapper.download_novel(novel)
-            return True
-        except ConnectionError:
-            return False
+            self.jobs.resume(novel.title)
+            self.jobs.add(novel.title, total=len(novel.chapter_list))
+            self.jobs.start(novel.title, len(novel.downloaded_set), len(novel.chapter_list))
+            try:
+                self.scrapper.download_novel(
+                    novel, lambda: self._stop.is_set() or self.jobs.is_paused(novel.title)
+                )
+            except ConnectionError as ex:
+                self.jobs.fail(novel.title, str(ex))
+                return False
+            finally:
+                print("============== SAVING NOVEL ==============")
+                self.scrapper.flush()
+                self.scrapper.save_rate_limits()
+                self.db.save_novel(novel)
+
+            if self._stop.is_set():
+                return False
+            # Only done once every chapter is written, exports start as soon as the job is done
+            self.jobs.finish(novel.title)
+            return not self.jobs.is_paused(novel.title)
         finally:
-            print("============== SAVING NOVEL ==============")
-            self.db.save_novel(novel)
+            with self._active_lock:
+                self._active_downloads.discard(novel.title)
+                self._active_lock.notify_all()
+
+    def enqueue_download(self, novel_title: str, priority=0):
+        """
+        Queues the novel for the background job worker, higher priorities are downloaded first.
+        """
+        self.jobs.add(novel_title, priority)
+        self._jobs_queued.set()
+
+    def pause_download(self, novel_title: str):
+        """
+        Stops the download of the novel after the chapters in flight, it stays paused until resumed.
+        """
+        self.jobs.pause(novel_title)
+
+    def resume_download(self, novel_title: str):
+        self.jobs.resume(novel_title)
+        self._jobs_queued.set()
+
+    def is_download_paused(self, novel_title: str) -> bool:
+        return self.jobs.is_paused(novel_title)
+
+    def start_job_worker(self):
+        """
+        Downloads the queued jobs in the background, jobs interrupted by a crash are picked up again.
+        """
+        self._job_thread = threading.Thread(target=self._run_jobs, name='download-jobs', daemon=True)
+        self._job_thread.start()
+
+    def _run_jobs(self):
+        while not self._stop.is_set():
+            novel_title = self.jobs.next()
+            if novel_title is None:
+                self._jobs_queued.wait(60)
+                self._jobs_queued.clear()
+                continue
+
+            novel = self.open_novel(novel_title)
+            if novel is None:
+                self.jobs.remove(novel_title)
+                continue
+            try:
+                success = self.download_novel(novel)
+            except Exception as ex:
+                print(f"Error downloading '{novel_title}'", ex)
+                traceback.print_exc()
+                self.jobs.fail(novel_title, str(ex))
+                success = False
+            if not success:
+                # Connection problems or a download already running, give it some time
+                self._stop.wait(30)
 
     def delete_novel(self, novel):
+        self.jobs.remove(novel.title)
         return self.db.delete_novel(novel.title)
 
     def write_novel(self, novel: Novel):
-        novel.write_to_txt(self.max_per_volume)
+        novel.write_to_txt(self.max_per_volume, self.db.get_chapters_content(novel.title))
 
     def get_downloaded_novels(self):
         return set(novel.title for novel in self.novels if novel.is_downloaded())
+
+    def start_update_sweeps(self, interval, workers=1):
+        """
+        Checks the whole library for new chapters every `interval` seconds in the background
+        and queues the updated novels for download.
+        """
+        self.scheduler = UpdateScheduler(self, interval, workers)
+        self.scheduler.start()
+
+    def close(self):
+        """
+        Cancels the running downloads and update checks, waits for them to store what they got
+        and then closes the browsers and the library.
+        """
+        self._stop.set()
+        self._jobs_queued.set()
+        with self._active_lock:
+            if self._active_downloads:
+                print(f"Waiting for {len(self._active_downloads)} downloads to stop")
+            self._active_lock.wait_for(lambda: not self._active_downloads)
+        if self.scheduler:
+            self.scheduler.stop(timeout=None)
+        if self._job_thread:
+            self._job_thread.join()
+        self.scrapper.close()
+        self.jobs.close()
+        self.db.close()
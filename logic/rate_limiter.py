@@ -0,0 +1,81 @@
+import asyncio
+import threading
+import time
+from urllib.parse import urlparse
+
+
+class _DomainState:
+    def __init__(self, rate: float):
+        self.rate = rate
+        self.tokens = 1.0
+        self.updated_at = time.monotonic()
+        self.failures = 0
+        self.blocked_until = 0.0
+
+
+class RateLimiter:
+    """
+    Token bucket per domain whose rate adapts to what the site tolerates.
+    The rate (requests per second) grows by `increase` after every successful request and is
+    halved on errors or challenge pages, consecutive failures also pause the domain for an
+    exponentially growing time. `rates` are the learned rates of a previous session.
+    """
+
+    def __init__(self, rates: dict[str, float] = None, initial_rate=1.0, min_rate=0.1, max_rate=10.0,
+                 increase=0.1, burst=2.0, base_backoff=1.0, max_backoff=60.0):
+        self.initial_rate = initial_rate
+        self.min_rate = min_rate
+        self.max_rate = max_rate
+        self.increase = increase
+        self.burst = burst
+        self.base_backoff = base_backoff
+        self.max_backoff = max_backoff
+        self._domains = {domain: _DomainState(rate) for domain, rate in (rates or {}).items()}
+        self._lock = threading.Lock()
+
+    def _get_state(self, url: str) -> _DomainState:
+        domain = urlparse(url).netloc
+        if domain not in self._domains:
+            self._domains[domain] = _DomainState(self.initial_rate)
+        return self._domains[domain]
+
+    def reserve(self, url: str) -> float:
+        """
+        Takes a token for a request to `url` and returns how many seconds to wait before sending it.
+        """
+        with self._lock:
+            state = self._get_state(url)
+            now = time.monotonic()
+            state.tokens = min(self.burst, state.tokens + (now - state.updated_at) * state.rate)
+            state.updated_at = now
+            state.tokens -= 1
+
+            wait = -state.tokens / state.rate if state.tokens < 0 else 0.0
+            return max(wait, state.blocked_until - now)
+
+    def acquire(self, url: str):
+        """
+        This is a blocking function.
+        """
+        time.sleep(self.reserve(url))
+
+    async def acquire_async(self, url: str):
+        await asyncio.sleep(self.reserve(url))
+
+    def success(self, url: str):
+        with self._lock:
+            state = self._get_state(url)
+            state.failures = 0
+            state.rate = min(self.max_rate, state.rate + self.increase)
+
+    def failure(self, url: str):
+        with self._lock:
+            state = self._get_state(url)
+            state.failures += 1
+            state.rate = max(self.min_rate, state.rate / 2)
+            backoff = min(self.max_backoff, self.base_backoff * 2 ** (state.failures - 1))
+            state.blocked_until = time.monotonic() + backoff
+
+    def get_rates(self) -> dict[str, float]:
+        with self._lock:
+            return {domain: state.rate for domain, state in self._domains.items()}
@@ -1,36 +1,195 @@
+import json
+import os
+import queue
 import random
+import threading
 import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Iterator, TypeVar
 
-import undetected_chromedriver as uc
+import psutil
 from selenium import webdriver
+from selenium.common.exceptions import InvalidSessionIdException, SessionNotCreatedException, WebDriverException
 from selenium.webdriver.chrome.service import Service as ChromeService
 from webdriver_manager.chrome import ChromeDriverManager
 from webdriver_manager.core.os_manager import ChromeType
 from typing import List
 
 from db.file import SimpleFileDB
-from utils import selenium
+from db.writer import ChapterWriter
+from utils import selenium, html as html_utils
+from .async_downloader import AsyncChapterDownloader
 from .entities import Chapter, Novel
-from .websites import Website, BasicWebsite
+from .http_client import HttpClient, PAGE_CACHE_TTL
+from .rate_limiter import RateLimiter
+from .websites import Website, BasicWebsite, FetchMode
 
+T = TypeVar('T')
 
-def get_driver(use_undetected: bool, is_chromium: bool) -> webdriver.Chrome:
-    type = ChromeType.GOOGLE
-    if is_chromium:
-        type = ChromeType.CHROMIUM
+
+def get_driver_path(chrome_type: ChromeType, refresh: bool = False,
+                    cache_path: str = 'internal/chromedriver.json') -> str:
+    """
+    Returns the chromedriver for the browser type, resolved once and reused offline from `cache_path`.
+    `refresh` resolves it again, e.g. after the browser was updated.
+    """
+    paths = {}
+    if os.path.exists(cache_path):
+        with open(cache_path, encoding='utf-8') as file:
+            paths = json.load(file)
+
+    path = paths.get(chrome_type)
+    if refresh or not path or not os.path.exists(path):
+        path = ChromeDriverManager(chrome_type=chrome_type).install()
+        paths[chrome_type] = path
+        with open(cache_path, 'w', encoding='utf-8') as file:
+            json.dump(paths, file)
+    return path
+
+
+def _start_driver(use_undetected: bool, driver_path: str, headless: bool, block_resources: bool) -> webdriver.Chrome:
+    options = webdriver.ChromeOptions()
+    if block_resources:
+        # Chapters are read once the DOM is parsed, there's no need to wait for every subresource
+        options.page_load_strategy = 'eager'
     if use_undetected:
-        options = webdriver.ChromeOptions()
+        # Imported here since it takes a noticeable part of the startup and is only needed with the browser
+        import undetected_chromedriver as uc
+
         options.add_argument("--start-maximized")
         options.add_argument('--disable-popup-blocking')
-
-        driver_service = ChromeService(ChromeDriverManager(chrome_type=type).install())
-        return uc.Chrome(options=options, use_subprocess=False, driver_executable_path=driver_service.path)
+        driver = uc.Chrome(options=options, use_subprocess=False, driver_executable_path=driver_path, headless=headless)
     else:
-        return webdriver.Chrome(service=ChromeService(ChromeDriverManager().install()))
+        if headless:
+            options.add_argument("--headless=new")
+            options.add_argument("--window-size=1920,1080")
+        driver = webdriver.Chrome(service=ChromeService(driver_path), options=options)
+
+    if block_resources:
+        selenium.block_resources(driver)
+    return driver
+
+
+def get_driver(use_undetected: bool, is_chromium: bool, headless: bool = False,
+               block_resources: bool = True) -> webdriver.Chrome:
+    """
+    Starts Chrome, the scraping profile (`block_resources`) skips images, fonts, media and ads
+    and returns from page loads as soon as the DOM is ready.
+    """
+    type = ChromeType.GOOGLE
+    if is_chromium:
+        type = ChromeType.CHROMIUM
+    try:
+        return _start_driver(use_undetected, get_driver_path(type), headless, block_resources)
+    except SessionNotCreatedException:
+        # The cached driver doesn't match the installed browser anymore
+        return _start_driver(use_undetected, get_driver_path(type, refresh=True), headless, block_resources)
+
+
+class LazyDriver:
+    """
+    Stands in for a webdriver.Chrome and only starts the browser when it is first used,
+    so sessions that don't scrape never launch it.
+    """
+    # Cookie attributes accepted back by the Network.setCookies CDP command
+    _cookie_fields = {'name', 'value', 'domain', 'path', 'secure', 'httpOnly', 'sameSite', 'expires'}
+
+    def __init__(self, factory: Callable[[], webdriver.Chrome]):
+        self._factory = factory
+        self._driver = None
+        self._lock = threading.Lock()
+
+    def is_started(self) -> bool:
+        return self._driver is not None
+
+    def start(self) -> webdriver.Chrome:
+        with self._lock:
+            if self._driver is None:
+                print("============== STARTING BROWSER ==============")
+                self._driver = self._factory()
+            return self._driver
+
+    def __getattr__(self, name):
+        return getattr(self.start(), name)
+
+    def close(self):
+        if self._driver:
+            self._driver.close()
+
+    def quit(self):
+        with self._lock:
+            if self._driver:
+                self._driver.quit()
+                self._driver = None
+
+    def get_memory_usage(self) -> int:
+        """
+        Resident memory in bytes of the driver and the browser processes it started.
+        """
+        driver = self._driver
+        if driver is None:
+            return 0
+
+        pids = [getattr(driver, 'browser_pid', None)]
+        service_process = getattr(getattr(driver, 'service', None), 'process', None)
+        if service_process:
+            pids.append(service_process.pid)
+
+        seen = set()
+        total = 0
+        for pid in pids:
+            if pid is None:
+                continue
+            try:
+                root = psutil.Process(pid)
+                for process in [root, *root.children(recursive=True)]:
+                    if process.pid not in seen:
+                        seen.add(process.pid)
+                        total += process.memory_info().rss
+            except psutil.Error:
+                continue
+        return total
 
+    def restart(self, restore_url: bool = True):
+        """
+        Replaces the browser with a new one, keeping the cookies of every site and,
+        with `restore_url`, going back to the page it was on.
+        """
+        with self._lock:
+            if self._driver is None:
+                return
 
-def _fix_duplicates(chapter_list: List[Chapter]) -> List[Chapter]:
-    titles = set()
+            url = None
+            cookies = []
+            try:
+                url = self._driver.current_url
+                cookies = self._driver.execute_cdp_cmd('Network.getAllCookies', {})['cookies']
+            except WebDriverException:
+                # The browser crashed, there's nothing to keep
+                pass
+            try:
+                self._driver.quit()
+            except WebDriverException:
+                pass
+
+            print("============== RESTARTING BROWSER ==============")
+            self._driver = self._factory()
+            if cookies:
+                self._driver.execute_cdp_cmd('Network.setCookies', {'cookies': [
+                    {key: value for key, value in cookie.items() if key in self._cookie_fields
+                     and not (key == 'expires' and cookie.get('session'))}
+                    for cookie in cookies
+                ]})
+            if restore_url and url and url.startswith('http'):
+                self._driver.get(url)
+
+
+def _fix_duplicates(chapter_list: List[Chapter], existing_titles: set[str] = None) -> List[Chapter]:
+    """
+    Numbers repeated titles, `existing_titles` are the titles of chapters already in the novel.
+    """
+    titles = set(existing_titles) if existing_titles else set()
     duplicated_titles = {}
 
     for chapter in chapter_list:
@@ -45,7 +204,10 @@ def _fix_duplicates(chapter_list: List[Chapter]) -> List[Chapter]:
     for title in duplicated_titles:
         count = 1
         for chapter in duplicated_titles[title]:
+            while f'{title} ({count})' in titles:
+                count += 1
             chapter.title += f' ({count})'
+            titles.add(chapter.title)
             count += 1
 
     return chapter_list
@@ -53,75 +215,464 @@ def _fix_duplicates(chapter_list: List[Chapter]) -> List[Chapter]:
 
 class ScrapperSelenium:
     def __init__(self, db: SimpleFileDB, driver: webdriver.Chrome = None, websites: dict[Website, BasicWebsite] = None,
-                 use_undetected_driver: bool = False):
+                 use_undetected_driver: bool = False, writer: ChapterWriter = None, pool: 'ScrapperPool' = None,
+                 http_client: HttpClient = None, async_downloader: AsyncChapterDownloader = None,
+                 rate_limiter: RateLimiter = None, recycle_pages=500, recycle_memory=1536 * 1024 * 1024,
+                 prefetch_tabs=2, archive_pages=False):
         self.websites = websites
         self.driver = driver
+        # A LazyDriver is restarted after `recycle_pages` pages or once the browser uses `recycle_memory` bytes
+        self.recycle_pages = recycle_pages
+        self.recycle_memory = recycle_memory
+        self._pages_served = 0
+        # Chapters loading in background tabs while the current one is read, 0 disables it
+        self.prefetch_tabs = prefetch_tabs
+        # Keeps the raw HTML of chapter pages to extract them again offline
+        self.archive_pages = archive_pages
         self.use_undetected_driver = use_undetected_driver
         self.db = db
+        self.writer = writer if writer else ChapterWriter(db)
+        self.pool = pool
+        self.http_client = http_client
+        self.async_downloader = async_downloader
+        self.rate_limiter = rate_limiter if rate_limiter else RateLimiter()
 
     def scroll_to_end(self) -> None:
         """
-        Scrolls to the bottom of the page.
+        Scrolls to the bottom of the page and gives lazy loaded content a moment to start loading,
+        only needed by websites with `lazy_load`.
         This is a blocking function.
         """
-        delay = random.uniform(1, 2) if self.use_undetected_driver else 0.5
-        delta = random.uniform(0.1, 0.3) if self.use_undetected_driver else 0.1
-        time.sleep(delay)
         self.driver.execute_script("window.scrollTo(0, document.body.scrollHeight)")
-        time.sleep(delay + delta)
+        time.sleep(random.uniform(0.3, 0.6) if self.use_undetected_driver else 0.3)
+
+    def _should_recycle_browser(self) -> bool:
+        """
+        Counts a page served by the browser and tells whether it reached a recycling threshold.
+        """
+        if not isinstance(self.driver, LazyDriver) or not self.driver.is_started():
+            return False
 
-    def fetch_page(self, url: str, title: str) -> None:
+        self._pages_served += 1
+        # Measuring the memory walks the process tree, it's only done every few pages
+        return self._pages_served >= self.recycle_pages or (
+                self._pages_served % 20 == 0 and self.driver.get_memory_usage() >= self.recycle_memory)
+
+    def _recycle_browser(self):
+        print(f"Recycling the browser after {self._pages_served} pages")
+        self.driver.restart(restore_url=False)
+        self._pages_served = 0
+
+    def fetch_page(self, url: str, title: str, allow_recycle=True) -> None:
+        """
+        Loads `url` in the current tab with retries. `allow_recycle=False` keeps the browser even past
+        the recycling thresholds, for callers with other tabs still open.
+        """
         max_retry = 5
         current = 0
+        if self._should_recycle_browser() and allow_recycle:
+            self._recycle_browser()
         while current < max_retry:
+            self.rate_limiter.acquire(url)
             try:
                 print(f"Loading [{title}] {url}...", end="")
                 self.driver.get(url)
                 print(" Loaded")
-                self.scroll_to_end()
+                if html_utils.is_challenge_title(self.driver.title):
+                    # The browser may still get through it, but the site wants us slower
+                    self.rate_limiter.failure(url)
+                else:
+                    self.rate_limiter.success(url)
                 return
             except Exception as ex:
                 current += 1
                 print("Error loading Page", ex)
-                time.sleep(0.8)
+                self.rate_limiter.failure(url)
+                if isinstance(self.driver, LazyDriver) and (
+                        isinstance(ex, InvalidSessionIdException) or 'crashed' in str(ex)):
+                    self.driver.restart(restore_url=False)
+                    self._pages_served = 0
         raise ConnectionError("Error loading page")
 
-    def _get_chapter_list(self, website):
+    def save_rate_limits(self):
+        self.db.set('rate_limits', self.rate_limiter.get_rates())
+
+    def _get_chapter_list(self, website, known_urls: set[str] = None):
         table_contents = website.get_table_content_element()
         if table_contents:
             selenium.wait_and_click(self.driver, table_contents)
 
-        self.scroll_to_end()
-
-        chapter_list = website.get_chapter_list()
-
-        chapter_list = _fix_duplicates(chapter_list)
+        if website.lazy_load:
+            self.scroll_to_end()
+        if not website.wait_for_chapter_list():
+            print("The table of contents didn't load in time")
 
-        return chapter_list
+        return website.get_chapter_list(known_urls)
 
     def search_basic_novel_info(self, novel_url: str, website_name) -> Novel | None:
         website = self.websites.get(Website(website_name))
         if website:
+            novel = self._search_basic_novel_info_over_http(website, novel_url)
+            if novel:
+                return novel
+
             self.fetch_page(novel_url, "Searching metadata")
+            website.wait_for_novel_page()
             return website.search_novel_metadata(novel_url)
 
+    def _search_basic_novel_info_over_http(self, website: BasicWebsite, novel_url: str) -> Novel | None:
+        """
+        Reads the metadata of websites in HTTP mode from the cached novel page, None when the browser is needed.
+        """
+        if not self.http_client or website.fetch_mode != FetchMode.HTTP:
+            return None
+
+        html = self.http_client.get_text(novel_url, cache_ttl=PAGE_CACHE_TTL)
+        if not html or html_utils.is_challenge_page(html):
+            return None
+        return website.parse_novel_metadata(html, novel_url)
+
     def get_chapter_list(self, novel: Novel) -> List[Chapter]:
         website = self.websites.get(novel.website)
         if website:
-            return self._get_chapter_list(website)
+            if self.driver.current_url != novel.url:
+                # The metadata may have come from the cache without loading the page
+                self.fetch_page(novel.url, "Loading chapter list")
+                website.wait_for_novel_page()
+            return _fix_duplicates(self._get_chapter_list(website))
+
+    def get_new_chapters(self, novel: Novel) -> List[Chapter]:
+        """
+        Returns the chapters of the table of contents that aren't in the novel yet, matched by URL.
+        Websites that support it only load the tail of the table of contents.
+        With a pool the check runs on any idle worker.
+        """
+        if self.pool:
+            return self.pool.run(novel.website, lambda worker: worker._get_new_chapters(novel))
+        return self._get_new_chapters(novel)
+
+    def _get_new_chapters(self, novel: Novel) -> List[Chapter]:
+        website = self.websites.get(novel.website)
+        if not website:
+            return []
+
+        self.fetch_page(novel.url, "Checking new chapters")
+        website.wait_for_novel_page()
+        known_urls = {chapter.url for chapter in novel.chapter_list}
+        chapter_list = self._get_chapter_list(website, known_urls) or []
+        new_chapters = [chapter for chapter in chapter_list if chapter.url not in known_urls]
+
+        return _fix_duplicates(new_chapters, {chapter.title for chapter in novel.chapter_list})
+
+    def flush(self):
+        self.writer.flush()
 
     def close(self):
-        self.driver.close()
+        try:
+            self.save_rate_limits()
+            if self.pool:
+                self.pool.close()
+            if self.http_client:
+                self.http_client.close()
+            self.writer.close()
+        finally:
+            self.driver.close()
+
+    def download_chapter_over_http(self, website_id: Website, chapter: Chapter) -> str | None:
+        """
+        Fetches the chapter without the browser for websites in HTTP mode.
+        Returns None when the page must be loaded in the browser instead.
+        """
+        website = self.websites.get(website_id)
+        if not self.http_client or website.fetch_mode != FetchMode.HTTP:
+            return None
+
+        html = self.http_client.get_text(chapter.url)
+        if html and html_utils.is_challenge_page(html):
+            self.rate_limiter.failure(chapter.url)
+            html = None
+        if not html:
+            print(f"Loading [{chapter.title}] needs the browser")
+            return None
+        self._archive_page(chapter.url, html)
+        return website.parse_chapter_content(html)
+
+    def download_chapter(self, website_id: Website, chapter: Chapter, allow_recycle=True) -> str | None:
+        website = self.websites.get(website_id)
+        self.fetch_page(chapter.url, chapter.title, allow_recycle)
+        if website.lazy_load:
+            self.scroll_to_end()
+        if not website.wait_for_chapter_content():
+            print(f"[{chapter.title}] content didn't load in time")
+        self._archive_current_page(chapter.url)
+        return website.get_chapter_content()
+
+    def _archive_page(self, url: str, html: str):
+        if self.archive_pages:
+            self.writer.put_page(url, html)
+
+    def _archive_current_page(self, url: str):
+        if self.archive_pages:
+            self.writer.put_page(url, self.driver.page_source)
+
+    def _open_tab(self, url: str) -> str:
+        """
+        Starts loading `url` in a new tab without waiting for it, returns the tab handle.
+        """
+        self.rate_limiter.acquire(url)
+        self.driver.switch_to.new_window('tab')
+        # Blocked resources are set per tab
+        patterns = getattr(self.driver, 'blocked_url_patterns', None)
+        if patterns:
+            selenium.block_resources(self.driver, patterns)
+        self.driver.execute_script("window.location.href = arguments[0];", url)
+        return self.driver.current_window_handle
+
+    def _read_tab(self, website_id: Website, chapter: Chapter, handle: str, main_window: str) -> str | None:
+        website = self.websites.get(website_id)
+        content = None
+        try:
+            self.driver.switch_to.window(handle)
+            if html_utils.is_challenge_title(self.driver.title):
+                self.rate_limiter.failure(chapter.url)
+            else:
+                self.rate_limiter.success(chapter.url)
+                if website.lazy_load:
+                    self.scroll_to_end()
+                website.wait_for_chapter_content()
+                self._archive_current_page(chapter.url)
+                content = website.get_chapter_content()
+                print(f"Loaded [{chapter.title}] {chapter.url}")
+        except WebDriverException as ex:
+            print(f"Error reading [{chapter.title}] from its tab", ex)
+            self.rate_limiter.failure(chapter.url)
+        finally:
+            try:
+                self.driver.switch_to.window(handle)
+                self.driver.close()
+            except WebDriverException:
+                pass
+            try:
+                self.driver.switch_to.window(main_window)
+            except WebDriverException as ex:
+                print("Error switching back to the main tab", ex)
+
+        # Anything the tab didn't get is loaded again with the usual retries. The browser isn't
+        # recycled here, that would drop the tabs still loading, the prefetch loop does it between them
+        return content or self.download_chapter(website_id, chapter, allow_recycle=False)
+
+    def download_chapters_prefetching(self, website_id: Website, chapters: List[Chapter],
+                                      is_cancelled: Callable[[], bool] = None
+                                      ) -> Iterator[tuple[Chapter, str | None]]:
+        """
+        Downloads the chapters one at a time in order, while the next `prefetch_tabs` chapters load in
+        background tabs of the same browser. No new page is loaded once `is_cancelled` returns True.
+        """
+        if self.prefetch_tabs <= 0:
+            for chapter in chapters:
+                if is_cancelled and is_cancelled():
+                    return
+                yield chapter, self.download_chapter(website_id, chapter)
+            return
+
+        chapters = deque(chapters)
+        if not chapters or (is_cancelled and is_cancelled()):
+            # Asking for the window handle would start the browser
+            return
+        pending = deque()
+        recycle = False
+        main_window = self.driver.current_window_handle
+        try:
+            while chapters or pending:
+                while chapters and len(pending) <= self.prefetch_tabs and not recycle:
+                    if is_cancelled and is_cancelled():
+                        break
+                    chapter = chapters.popleft()
+                    pending.append((chapter, self._open_tab(chapter.url)))
+                    recycle = self._should_recycle_browser()
+                if is_cancelled and is_cancelled():
+                    # The tabs still loading are closed below
+                    return
+                if not pending:
+                    # Every open tab was read, the browser can be replaced now
+                    self._recycle_browser()
+                    main_window = self.driver.current_window_handle
+                    recycle = False
+                    continue
+
+                chapter, handle = pending.popleft()
+                yield chapter, self._read_tab(website_id, chapter, handle, main_window)
+        finally:
+            for _, handle in pending:
+                try:
+                    self.driver.switch_to.window(handle)
+                    self.driver.close()
+                except WebDriverException:
+                    pass
+            try:
+                self.driver.switch_to.window(main_window)
+            except WebDriverException:
+                pass
+
+    def _store_chapter(self, novel: Novel, chapter: Chapter, content: str):
+        chapter.content = content
+        novel.downloaded_set.add(chapter.title)
+
+        self.writer.put(novel, chapter)
 
-    def download_novel(self, novel: Novel):
+    def download_novel(self, novel: Novel, is_cancelled: Callable[[], bool] = None):
+        """
+        Downloads the missing chapters, stops early once `is_cancelled` returns True.
+        """
         website = self.websites.get(novel.website)
-        for chapter in novel.get_chapters_to_download():
-            self.fetch_page(chapter.url, chapter.title)
-            content = website.get_chapter_content()
+        chapters = novel.get_chapters_to_download()
+        fetch_over_http = self.download_chapter_over_http if website.fetch_mode == FetchMode.HTTP else None
+
+        if self.async_downloader and website.fetch_mode == FetchMode.HTTP:
+            # Whatever the async pipeline can't parse is retried in the browser
+            chapters = self.async_downloader.download(
+                website, chapters, lambda chapter, content: self._store_chapter(novel, chapter, content), is_cancelled,
+                self._archive_page,
+            )
+            fetch_over_http = None
+            if is_cancelled and is_cancelled():
+                # A cancelled pipeline returns every chapter, they aren't failures to retry
+                return
+
+        if self.pool:
+            results = self.pool.download_chapters(novel.website, chapters, fetch_over_http, is_cancelled)
+        elif fetch_over_http is None:
+            results = self.download_chapters_prefetching(novel.website, chapters, is_cancelled)
+        else:
+            results = (
+                (chapter, (fetch_over_http and fetch_over_http(novel.website, chapter))
+                 or self.download_chapter(novel.website, chapter))
+                for chapter in chapters
+                if not (is_cancelled and is_cancelled())
+            )
+
+        for chapter, content in results:
+            if is_cancelled and is_cancelled():
+                break
             if not content:
                 continue
 
-            chapter.content = content
-            novel.downloaded_set.add(chapter.title)
+            self._store_chapter(novel, chapter, content)
+
+
+class ScrapperPool:
+    """
+    Browser workers that download chapters in parallel, each one a ScrapperSelenium with its own driver.
+    Workers are created on demand by `scrapper_factory`, up to `size` of them, and at most
+    `website_limits[website]` (default `size`) work on the same website at once.
+    The scrapper owning the pool isn't a worker, its browser stays free for searches.
+    """
+
+    def __init__(self, scrapper_factory: Callable[[], ScrapperSelenium], size: int,
+                 website_limits: dict[Website, int] = None):
+        self.scrapper_factory = scrapper_factory
+        self.size = size
+        self.website_limits = website_limits if website_limits else {}
+        self._workers = []
+        self._idle = queue.Queue()
+        self._lock = threading.Lock()
+        self._website_semaphores = {}
+
+    def _get_limit(self, website_id: Website) -> int:
+        return max(1, min(self.size, self.website_limits.get(website_id, self.size)))
+
+    def _get_semaphore(self, website_id: Website) -> threading.Semaphore:
+        with self._lock:
+            if website_id not in self._website_semaphores:
+                self._website_semaphores[website_id] = threading.Semaphore(self._get_limit(website_id))
+            return self._website_semaphores[website_id]
+
+    def _acquire_worker(self) -> ScrapperSelenium:
+        with self._lock:
+            if self._idle.empty() and len(self._workers) < self.size:
+                worker = self.scrapper_factory()
+                self._workers.append(worker)
+                return worker
+        return self._idle.get()
+
+    def run(self, website_id: Website, task: Callable[[ScrapperSelenium], T]) -> T:
+        """
+        Runs `task` with an idle worker, within the website limit.
+        """
+        with self._get_semaphore(website_id):
+            worker = self._acquire_worker()
+            try:
+                return task(worker)
+            finally:
+                self._idle.put(worker)
+
+    def _download_chapter(self, website_id: Website, chapter: Chapter,
+                          fetch_over_http: Callable[[Website, Chapter], str | None] = None,
+                          is_cancelled: Callable[[], bool] = None) -> str | None:
+        with self._get_semaphore(website_id):
+            if is_cancelled and is_cancelled():
+                return None
+            content = fetch_over_http(website_id, chapter) if fetch_over_http else None
+            if content:
+                return content
+
+        if is_cancelled and is_cancelled():
+            return None
+        return self.run(website_id, lambda worker: worker.download_chapter(website_id, chapter))
+
+    def _download_chapters_prefetching(self, website_id: Website, chapters: List[Chapter],
+                                       is_cancelled: Callable[[], bool] = None
+                                       ) -> Iterator[tuple[Chapter, str | None]]:
+        with self._get_semaphore(website_id):
+            if not chapters or (is_cancelled and is_cancelled()):
+                return
+            worker = self._acquire_worker()
+            try:
+                yield from worker.download_chapters_prefetching(website_id, chapters, is_cancelled)
+            finally:
+                self._idle.put(worker)
+
+    def download_chapters(self, website_id: Website, chapters: List[Chapter],
+                          fetch_over_http: Callable[[Website, Chapter], str | None] = None,
+                          is_cancelled: Callable[[], bool] = None,
+                          ) -> Iterator[tuple[Chapter, str | None]]:
+        """
+        Downloads the chapters in parallel and yields them with their content in the original order.
+        Only a bounded window of chapters is in flight, so finished ones wait for at most a few slower ones.
+        `fetch_over_http` is tried first, a browser worker is only taken when it returns nothing.
+        Websites limited to a single worker are downloaded by one worker prefetching in background tabs.
+        Nothing new is submitted once `is_cancelled` returns True.
+        """
+        threads = self._get_limit(website_id)
+        if threads == 1 and fetch_over_http is None:
+            yield from self._download_chapters_prefetching(website_id, chapters, is_cancelled)
+            return
 
-            self.db.set_chapter(novel, chapter)
+        window = threads * 2
+        chapters = iter(chapters)
+        pending = deque()
+        executor = ThreadPoolExecutor(max_workers=threads, thread_name_prefix='scrapper-worker')
+        try:
+            for chapter in chapters:
+                if is_cancelled and is_cancelled():
+                    break
+                pending.append((chapter, executor.submit(
+                    self._download_chapter, website_id, chapter, fetch_over_http, is_cancelled)))
+                if len(pending) >= window:
+                    break
+
+            while pending:
+                chapter, future = pending.popleft()
+                next_chapter = None if is_cancelled and is_cancelled() else next(chapters, None)
+                if next_chapter:
+                    pending.append(
+                        (next_chapter, executor.submit(
+                            self._download_chapter, website_id, next_chapter, fetch_over_http, is_cancelled))
+                    )
+                yield chapter, future.result()
+        finally:
+            executor.shutdown(wait=True, cancel_futures=True)
+
+    def close(self):
+        for worker in self._workers:
+            worker.driver.quit()
@@ -0,0 +1,105 @@
+import threading
+import time
+import traceback
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from logic.novel_downloader import NovelDownloader
+
+
+class UpdateScheduler:
+    """
+    Periodically checks every novel of the library for new chapters and queues the novels
+    that got new ones in the download jobs.
+    Novels that were updated most recently are checked first, `workers` checks run at once
+    (the scrapper pool keeps them within each website limit). The sweep progress is stored
+    under 'update_sweep', an interrupted sweep resumes where it stopped.
+    """
+
+    def __init__(self, downloader: 'NovelDownloader', interval=24 * 60 * 60, workers=1):
+        self.downloader = downloader
+        self.interval = interval
+        self.workers = workers
+        self.state = downloader.db.get('update_sweep') or {
+            'sweep_started': None,
+            'last_sweep': 0,
+            'novels': {},
+        }
+        # Downloads queued by older versions move to the job queue
+        for novel_title in self.state.pop('download_queue', []):
+            downloader.enqueue_download(novel_title)
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run_sweeps, name='run-sweeps', daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout=5):
+        self._stop.set()
+        if self._thread:
+            self._thread.join(timeout)
+
+    def _save_state(self):
+        with self._lock:
+            self.downloader.db.set('update_sweep', self.state)
+
+    def _run_sweeps(self):
+        while not self._stop.is_set():
+            next_sweep = self.state['last_sweep'] + self.interval
+            if self.state['sweep_started'] or time.time() >= next_sweep:
+                self.sweep()
+            else:
+                self._stop.wait(next_sweep - time.time())
+
+    def sweep(self):
+        with self._lock:
+            if not self.state['sweep_started']:
+                self.state['sweep_started'] = time.time()
+            sweep_started = self.state['sweep_started']
+        self._save_state()
+
+        print("============== CHECKING LIBRARY UPDATES ==============")
+        with ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix='update-check') as executor:
+            list(executor.map(self._check_novel, self._get_pending_titles(sweep_started)))
+
+        if self._stop.is_set():
+            return
+        with self._lock:
+            self.state['sweep_started'] = None
+            self.state['last_sweep'] = time.time()
+        self._save_state()
+
+    def _get_pending_titles(self, sweep_started: float) -> List[str]:
+        novels = self.state['novels']
+        titles = [
+            entry.title for entry in self.downloader.db.get_catalog()
+            if novels.get(entry.title, {}).get('last_checked', 0) < sweep_started
+        ]
+        return sorted(titles, key=lambda title: novels.get(title, {}).get('last_update', 0), reverse=True)
+
+    def _check_novel(self, novel_title: str):
+        if self._stop.is_set():
+            return
+
+        novel = self.downloader.open_novel(novel_title)
+        if novel is None:
+            return
+        try:
+            new_chapters = self.downloader.check_new_chapters(novel)
+        except Exception as ex:
+            print(f"Error checking '{novel_title}' for new chapters", ex)
+            traceback.print_exc()
+            new_chapters = []
+
+        with self._lock:
+            novel_state = self.state['novels'].setdefault(novel_title, {})
+            novel_state['last_checked'] = time.time()
+            if new_chapters:
+                print(f"{len(new_chapters)} new chapters of '{novel_title}'")
+                novel_state['last_update'] = time.time()
+        self._save_state()
+        if new_chapters:
+            self.downloader.enqueue_download(novel_title)
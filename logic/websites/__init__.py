@@ -1,17 +1,27 @@
 from abc import ABC, abstractmethod
 from enum import Enum
+from urllib.parse import urlparse
 
 from selenium import webdriver
 from selenium.webdriver.common.by import By
 
 import utils.selenium as selen
 from logic.entities import Novel
+from logic.http_client import HttpClient
 
 
 def get_website_ids() -> list[str]:
     return [website.value for website in Website]
 
 
+def get_website_for_url(url: str) -> 'Website | None':
+    domain = urlparse(url).netloc.removeprefix('www.')
+    for website in Website:
+        if urlparse(website.value).netloc.removeprefix('www.') == domain:
+            return website
+    return None
+
+
 class Website(Enum):
     LightNovelCave = "https://www.lightnovelcave.com"
     NovelBin = "https://novel-bin.com"
@@ -19,10 +29,21 @@ class Website(Enum):
     NovelCool = "https://www.novelcool.com"
 
 
+class FetchMode(Enum):
+    # Plain HTTP request parsed with the site selectors, the browser is only used as a fallback
+    HTTP = "http"
+    BROWSER = "browser"
+
+
 class BasicWebsite(ABC):
-    def __init__(self, driver: webdriver.Chrome, website_id: Website):
+    fetch_mode = FetchMode.BROWSER
+    # Websites that only render content once it is scrolled into view
+    lazy_load = False
+
+    def __init__(self, driver: webdriver.Chrome, website_id: Website, http_client: HttpClient = None):
         self.driver = driver
         self.id = website_id
+        self.http_client = http_client
 
     def _get_element_text(self, css_selector: str) -> str | None:
         element = selen.get_element(self.driver, By.CSS_SELECTOR, css_selector)
@@ -70,9 +91,43 @@ class BasicWebsite(ABC):
         pass
 
     @abstractmethod
-    def get_chapter_list(self):
+    def get_chapter_list(self, known_urls: set[str] = None):
+        """
+        `known_urls` are chapters already tracked, websites may use them to skip loading
+        parts of the table of contents that only contain known chapters.
+        """
         pass
 
     @abstractmethod
     def get_chapter_content(self):
         pass
+
+    def wait_for_novel_page(self, timeout: float = 10) -> bool:
+        """
+        Waits until the novel main page is rendered, False on timeout.
+        """
+        return True
+
+    def wait_for_chapter_list(self, timeout: float = 10) -> bool:
+        """
+        Waits until the table of contents is rendered, False on timeout.
+        """
+        return True
+
+    def wait_for_chapter_content(self, timeout: float = 10) -> bool:
+        """
+        Waits until the chapter text is rendered, False on timeout.
+        """
+        return True
+
+    def parse_chapter_content(self, html: str) -> str | None:
+        """
+        Extracts the chapter content from a page fetched without the browser.
+        """
+        return None
+
+    def parse_novel_metadata(self, html: str, novel_url: str) -> Novel | None:
+        """
+        Extracts the novel metadata from its main page fetched without the browser.
+        """
+        return None
@@ -1,16 +1,26 @@
+import re
 import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import List
 
 from selenium import webdriver
 from selenium.webdriver.common.by import By
 
 from logic.entities import Chapter
-from logic.websites import Website
+from logic.http_client import HttpClient
+from logic.websites import Website, FetchMode
 from logic.websites.normal_website import NormalWebsite
 from utils import image, selenium
 
+page_number_regex = re.compile(r'(page[=-])(\d+)')
+
 
 class LightNovelCave(NormalWebsite):
-    def __init__(self, driver: webdriver.Chrome):
+    fetch_mode = FetchMode.HTTP
+    cover_extension = '.png'
+    page_concurrency = 6
+
+    def __init__(self, driver: webdriver.Chrome, http_client: HttpClient = None):
         selectors = {
             '_get_title': '#novel > header > div.header-body.container > div.novel-info > div.main-head > h1',
             '_get_description': '#info > div.summary > div',
@@ -20,17 +30,74 @@ class LightNovelCave(NormalWebsite):
             'get_chapter_list': '#chpagedlist > ul',
             'get_chapter_content': '#chapter-container',
         }
-        super().__init__(driver, Website.LightNovelCave, selectors)
-
-    def _get_cover_img(self, novel_title):
-        img_src = self._get_image_src(self.selectors['_get_cover_img'])
+        super().__init__(driver, Website.LightNovelCave, selectors, http_client)
 
+    def _download_cover(self, novel_title, img_src):
         return image.download_with_screenshot(self.driver, novel_title, img_src) if img_src else None
 
     def get_chapters_from_page(self) -> [Chapter]:
         return super().get_chapter_list()
 
-    def get_chapter_list(self) -> [Chapter]:
+    def _get_page_urls(self) -> list[str] | None:
+        """
+        Builds the URLs of the table of contents pages after the current one from the pager links.
+        None when the pager can't be understood.
+        """
+        links = selenium.get_links(self.driver, '#chpagedlist > div > div > div > ul')
+        if links is None:
+            return []
+
+        pages = []
+        for _, href in links:
+            matches = list(page_number_regex.finditer(href or ''))
+            if matches:
+                pages.append((int(matches[-1].group(2)), href, matches[-1]))
+        if not pages:
+            return None
+
+        last_page, href, match = max(pages, key=lambda page: page[0])
+        return [
+            href[:match.start()] + f'{match.group(1)}{page}' + href[match.end():]
+            for page in range(2, last_page + 1)
+        ]
+
+    def _get_chapters_from_url(self, page_url: str) -> List[Chapter] | None:
+        # Always revalidated, unchanged pages come back as a cheap 304
+        html = self.http_client.get_text(page_url, cache_ttl=0)
+        return self.parse_chapter_list(html, page_url) if html else None
+
+    def _get_pages(self, page_urls: list[str], known_urls: set[str] = None) -> List[List[Chapter]] | None:
+        """
+        Loads the pages concurrently, from the last one backwards, and returns them in order.
+        With `known_urls` it stops after the batch that reaches an already known chapter, so only a tail
+        of the pages is returned. None if a page couldn't be loaded.
+        """
+        pages = []
+        with ThreadPoolExecutor(max_workers=self.page_concurrency) as executor:
+            for end in range(len(page_urls), 0, -self.page_concurrency):
+                batch_urls = page_urls[max(0, end - self.page_concurrency):end]
+                batch = list(executor.map(self._get_chapters_from_url, batch_urls))
+                if any(page is None for page in batch):
+                    return None
+                pages = batch + pages
+                if known_urls and any(chapter.url in known_urls for page in batch for chapter in page):
+                    break
+        return pages
+
+    def get_chapter_list(self, known_urls: set[str] = None) -> [Chapter]:
+        page_urls = self._get_page_urls() if self.http_client else None
+        pages = self._get_pages(page_urls, known_urls) if page_urls is not None else None
+        if pages is None:
+            return self._get_chapter_list_by_clicking()
+
+        all_chapters = []
+        if len(pages) == len(page_urls):
+            all_chapters.extend(self.get_chapters_from_page())
+        for page in pages:
+            all_chapters.extend(page)
+        return all_chapters
+
+    def _get_chapter_list_by_clicking(self) -> [Chapter]:
         all_chapters = []
         while True:
             all_chapters.extend(self.get_chapters_from_page())
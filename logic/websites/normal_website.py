@@ -1,16 +1,24 @@
+import os
+from urllib.parse import urljoin
+
 import requests
 from selenium import webdriver
 from selenium.webdriver.common.by import By
 from selenium.webdriver.remote.webelement import WebElement
 
-from logic.entities import Chapter
+from logic.entities import Chapter, Novel
+from logic.http_client import HttpClient, COVER_CACHE_TTL
 from logic.websites import Website, BasicWebsite
-from utils import image, selenium
+from utils import image, selenium, html as html_utils
 
 
 class NormalWebsite(BasicWebsite):
-    def __init__(self, driver: webdriver.Chrome, website: Website, selectors: dict = None):
-        super().__init__(driver, website)
+    # Websites whose covers are screenshots from the browser store them as .png
+    cover_extension = '.jpg'
+
+    def __init__(self, driver: webdriver.Chrome, website: Website, selectors: dict = None,
+                 http_client: HttpClient = None):
+        super().__init__(driver, website, http_client)
         self.selectors = selectors
 
     def _get_title(self):
@@ -23,19 +31,80 @@ class NormalWebsite(BasicWebsite):
         return self._get_element_text(self.selectors['_get_author'])
 
     def _get_cover_img(self, novel_title):
-        img_src = self._get_image_src(self.selectors['_get_cover_img'])
+        return self._download_cover(novel_title, self._get_image_src(self.selectors['_get_cover_img']))
+
+    def _download_cover(self, novel_title, img_src):
         if img_src:
-            image_path, image_name = image.get_path_and_name(img_src, novel_title)
+            image_path, image_name = image.get_path_and_name(img_src, novel_title, self.cover_extension)
 
-            response = requests.get(img_src)
-            if response.status_code != 200:
+            if self.http_client:
+                content = self.http_client.get_content(img_src, cache_ttl=COVER_CACHE_TTL)
+            else:
+                response = requests.get(img_src)
+                content = response.content if response.status_code == 200 else None
+            if not content:
                 return None
 
             with open(image_path, 'wb') as f:
-                f.write(response.content)
+                f.write(content)
             return image_name
         return None
 
+    def _download_cover_over_http(self, novel_title, img_src):
+        """
+        Downloads the cover without the browser for metadata read over HTTP, covers already on disk are
+        kept. Falls back to `_download_cover` when the response isn't an image.
+        """
+        if not img_src:
+            return None
+        image_path, image_name = image.get_path_and_name(img_src, novel_title, self.cover_extension)
+        if os.path.exists(image_path):
+            return image_name
+
+        content = self.http_client.get_content(img_src, cache_ttl=COVER_CACHE_TTL) if self.http_client else None
+        if not content or not image.is_image_data(content):
+            return self._download_cover(novel_title, img_src)
+
+        with open(image_path, 'wb') as f:
+            f.write(content)
+        return image_name
+
+    def search_novel_metadata(self, novel_url):
+        metadata = selenium.read_elements(self.driver, {
+            'title': (self.selectors['_get_title'], 'innerText'),
+            'author': (self.selectors['_get_author'], 'innerText'),
+            'description': (self.selectors['_get_description'], 'innerText'),
+            'cover': (self.selectors['_get_cover_img'], 'src'),
+        })
+        return Novel(
+            metadata['title'],
+            metadata['author'],
+            novel_url,
+            metadata['description'],
+            self.id,
+            self._download_cover(metadata['title'], metadata['cover'])
+        )
+
+    def parse_novel_metadata(self, html: str, novel_url: str) -> Novel | None:
+        tree = html_utils.parse(html)
+        title = html_utils.get_element(tree, self.selectors['_get_title'])
+        if title is None:
+            return None
+
+        author = html_utils.get_element(tree, self.selectors['_get_author'])
+        description = html_utils.get_element(tree, self.selectors['_get_description'])
+        cover = html_utils.get_element(tree, self.selectors['_get_cover_img'])
+        cover_src = (cover.get('src') or cover.get('data-src')) if cover is not None else None
+        title = html_utils.get_text(title)
+        return Novel(
+            title,
+            html_utils.get_text(author) if author is not None else None,
+            novel_url,
+            html_utils.get_lines(description) if description is not None else None,
+            self.id,
+            self._download_cover_over_http(title, urljoin(novel_url, cover_src) if cover_src else None)
+        )
+
     def get_table_content_element(self) -> WebElement:
         return selenium.get_element(
             self.driver,
@@ -43,21 +112,37 @@ class NormalWebsite(BasicWebsite):
             self.selectors['get_table_content_clickable_element'],
         )
 
-    def get_chapter_list(self) -> [Chapter]:
-        content = selenium.get_element(
-            self.driver,
-            By.CSS_SELECTOR,
-            self.selectors['get_chapter_list'],
-        )
-        if content:
-            a_tags = content.find_elements(By.TAG_NAME, 'a')
-            return [Chapter(a.get_attribute('title'), a.get_attribute('href')) for a in a_tags]
+    def get_chapter_list(self, known_urls: set[str] = None) -> [Chapter]:
+        links = selenium.get_links(self.driver, self.selectors['get_chapter_list'])
+        if links is not None:
+            return [Chapter(title, href) for title, href in links]
+
+    def parse_chapter_list(self, html: str, page_url: str) -> [Chapter]:
+        """
+        Extracts the chapter list from a table of contents page fetched without the browser.
+        """
+        content = html_utils.get_element(html_utils.parse(html), self.selectors['get_chapter_list'])
+        if content is not None:
+            return [Chapter(a.get('title'), urljoin(page_url, a.get('href'))) for a in content.iter('a')]
 
     def get_chapter_content(self):
-        chapter_content = selenium.get_element(
-            self.driver,
-            By.CSS_SELECTOR,
-            self.selectors['get_chapter_content'],
-        )
+        return selenium.get_paragraphs_text(self.driver, self.selectors['get_chapter_content'])
+
+    def wait_for_novel_page(self, timeout: float = 10) -> bool:
+        return selenium.wait_for_text(self.driver, self.selectors['_get_title'], timeout)
+
+    def wait_for_chapter_list(self, timeout: float = 10) -> bool:
+        return selenium.wait_for_links(self.driver, self.selectors['get_chapter_list'], timeout)
+
+    def wait_for_chapter_content(self, timeout: float = 10) -> bool:
+        return selenium.wait_for_text(self.driver, self.selectors['get_chapter_content'], timeout)
+
+    def parse_chapter_content(self, html: str) -> str | None:
+        chapter_content = html_utils.get_element(html_utils.parse(html), self.selectors['get_chapter_content'])
+        if chapter_content is None:
+            return None
 
-        return '\n'.join(p.text for p in chapter_content.find_elements(By.TAG_NAME, 'p')).strip()
+        paragraphs = list(chapter_content.iter('p'))
+        if not paragraphs:
+            return html_utils.get_lines(chapter_content)
+        return '\n'.join(html_utils.get_text(p) for p in paragraphs).strip()
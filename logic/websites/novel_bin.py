@@ -1,12 +1,16 @@
 from selenium import webdriver
 
-from logic.websites import Website
+from logic.http_client import HttpClient
+from logic.websites import Website, FetchMode
 from logic.websites.normal_website import NormalWebsite
 from utils import image
 
 
 class NovelBin(NormalWebsite):
-    def __init__(self, driver: webdriver.Chrome):
+    fetch_mode = FetchMode.HTTP
+    cover_extension = '.png'
+
+    def __init__(self, driver: webdriver.Chrome, http_client: HttpClient = None):
         selectors = {
             '_get_title': '#novel > div.col-xs-12.col-sm-12.col-md-9.col-novel-main > div.col-xs-12.col-info-desc > div.col-xs-12.col-sm-8.col-md-8.desc > h3',
             '_get_description': '#tab-description > div',
@@ -16,9 +20,7 @@ class NovelBin(NormalWebsite):
             'get_chapter_list': '#list-chapter > div > div > div',
             'get_chapter_content': '#chr-content',
         }
-        super().__init__(driver, Website.NovelBin, selectors)
-
-    def _get_cover_img(self, novel_title):
-        img_src = self._get_image_src(self.selectors['_get_cover_img'])
+        super().__init__(driver, Website.NovelBin, selectors, http_client)
 
+    def _download_cover(self, novel_title, img_src):
         return image.download_with_screenshot(self.driver, novel_title, img_src) if img_src else None
@@ -1,12 +1,15 @@
 from selenium import webdriver
 
 from logic.entities import Chapter
-from logic.websites import Website
+from logic.http_client import HttpClient
+from logic.websites import Website, FetchMode
 from logic.websites.normal_website import NormalWebsite
 
 
 class NovelCool(NormalWebsite):
-    def __init__(self, driver: webdriver.Chrome):
+    fetch_mode = FetchMode.HTTP
+
+    def __init__(self, driver: webdriver.Chrome, http_client: HttpClient = None):
         selectors = {
             '_get_title': 'body > div.site-content > div.bookinfo-module > div.bk-intro > div.bk-side-intro > div.bk-side-intro-most > h1',
             '_get_description': 'body > div.site-content > div.bookinfo-module > div.for-mob > div.bk-summary > div.bk-summary-txt',
@@ -16,7 +19,7 @@ class NovelCool(NormalWebsite):
             'get_chapter_list': 'body > div.site-content > section > div > div.tab-item.active > div:nth-child(2) > div.chapter-item-list > div',
             'get_chapter_content': 'body > div.site-content > div.chp-skin.null > div.chapter-reading-section-list > div > div',
         }
-        super().__init__(driver, Website.NovelCool, selectors)
+        super().__init__(driver, Website.NovelCool, selectors, http_client)
 
-    def get_chapter_list(self) -> [Chapter]:
-        return list(reversed(super().get_chapter_list()))
+    def get_chapter_list(self, known_urls: set[str] = None) -> [Chapter]:
+        return list(reversed(super().get_chapter_list(known_urls)))
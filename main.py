@@ -1,8 +1,24 @@
 from inyector import build_app
+from logic.websites import Website
+
+
+# Also used by bench_startup.py, so the benchmark measures the real configuration
+APP_CONFIG = dict(
+    use_undetected=True,
+    max_per_volume=300,
+    is_chromium=False,
+    workers=3,
+    website_limits={Website.Webnovel: 1},
+    # Library update sweeps start browsers in the background, they're opt-in (see cli.py --daemon)
+    update_interval=None,
+    # The GUI keeps the browser visible so challenges can be solved by hand, cli.py runs it headless
+    headless=False,
+    archive_pages=False,
+)
 
 
 def main() -> None:
-    app = build_app(use_undetected=True, max_per_volume=300, is_chromium=False)
+    app = build_app(**APP_CONFIG)
     try:
         app.run()
     finally:
@@ -0,0 +1,77 @@
+import argparse
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+from db.file import SimpleFileDB
+from inyector import build_websites
+from logic.websites import Website
+
+_websites = None
+
+
+def _init_worker():
+    global _websites
+    # Parsing archived pages only needs the selectors, no browser or network
+    _websites = build_websites(None, None)
+
+
+def _extract(page: tuple[Website, str, str]) -> tuple[str, str | None]:
+    website_id, chapter_title, html = page
+    return chapter_title, _websites[website_id].parse_chapter_content(html)
+
+
+def reextract_novel(db: SimpleFileDB, executor: ProcessPoolExecutor, novel_title: str, dry_run=False) -> int:
+    """
+    Extracts the chapters of the novel again from their archived pages, returns how many changed.
+    """
+    novel = db.load_novel(novel_title)
+    if novel is None:
+        print(f"'{novel_title}' isn't in the library")
+        return 0
+
+    chapters = {chapter.url: chapter for chapter in novel.chapter_list}
+    pages = db.get_pages(list(chapters))
+    if not pages:
+        print(f"'{novel_title}' has no archived pages")
+        return 0
+
+    work = [(novel.website, chapters[url].title, html) for url, html in pages.items()]
+    contents = dict(executor.map(_extract, work, chunksize=16))
+
+    changed = []
+    for chapter in novel.chapter_list:
+        content = contents.get(chapter.title)
+        if content and content != chapter.content:
+            chapter.content = content
+            changed.append(chapter)
+
+    print(f"'{novel_title}': {len(pages)} archived pages, {len(changed)} chapters changed")
+    if changed and not dry_run:
+        db.set_chapters(novel, changed)
+        novel.downloaded_set.update(chapter.title for chapter in changed)
+        db.save_novel(novel)
+    return len(changed)
+
+
+def main(args=None) -> None:
+    """
+    Runs the current website selectors again over the archived chapter pages, offline,
+    and stores the chapters whose content changed.
+    """
+    parser = argparse.ArgumentParser(description="Extracts chapters again from their archived pages.")
+    parser.add_argument('titles', nargs='*', help="Novels to extract again (default: the whole library)")
+    parser.add_argument('--workers', type=int, default=os.cpu_count(), help="Parsing processes (default: all cores)")
+    parser.add_argument('--dry-run', action='store_true', help="Only report what would change")
+    args = parser.parse_args(args)
+
+    db = SimpleFileDB()
+    try:
+        with ProcessPoolExecutor(max_workers=args.workers, initializer=_init_worker) as executor:
+            for novel_title in args.titles or db.keys():
+                reextract_novel(db, executor, novel_title, args.dry_run)
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
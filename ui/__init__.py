@@ -7,9 +7,6 @@ from logic.filter import ContentFilter
 from logic.novel_downloader import NovelDownloader
 from logic.websites import get_website_ids
 from utils import constants
-from ml_processor.train_model import train
-from ml_processor.labeler import build_training_data
-from ml_processor import prediction
 import os
 import webbrowser
 
@@ -92,7 +89,7 @@ class NovelUI:
     def display_books(self, book_list):
         for i, novel in enumerate(book_list):
             button = ttk.Button(self.scrollable_frame, text=novel.title,
-                                command=lambda n=novel: self._add_book_image_and_details(n))
+                                command=lambda n=novel: self.open_novel(n))
             button.grid(row=i, column=0, pady=5, padx=5, sticky='ew')
 
     def show_loader(self):
@@ -129,6 +126,14 @@ class NovelUI:
             del self.loader_frames
             del self.loader_label
 
+    @threaded_task
+    def open_novel(self, novel):
+        opened_novel = self.downloader.open_novel(novel.title)
+        if opened_novel:
+            def update_gui():
+                self._add_book_image_and_details(opened_novel)
+            self.root.after(0, update_gui)
+
     @threaded_task
     def perform_search(self, event=None):
         novel_url = self.search_entry.get()
@@ -178,6 +183,10 @@ class NovelUI:
     ################ ML Functions ##########################
     @threaded_task
     def train_model(self, novel):
+        # The ML stack takes seconds to import, it's only loaded when the export flow uses it
+        from ml_processor.train_model import train
+        from ml_processor.labeler import build_training_data
+
         build_training_data()
         train()
         def after_training():
@@ -201,6 +210,8 @@ class NovelUI:
 
     @threaded_task
     def run_model(self, novel):
+        from ml_processor import prediction
+
         model, tokenizer = prediction.load_model()
         total_chapters = len(novel.chapter_list)
         for i, chapter in enumerate(novel.chapter_list, start=1):
@@ -350,6 +361,23 @@ class NovelUI:
                 self._add_book_image_and_details(novel)
             self.root.after(0, update_gui)
 
+    def pause_download(self, novel):
+        self.downloader.pause_download(novel.title)
+        self._add_book_image_and_details(novel)
+
+    def resume_download(self, novel):
+        self.downloader.resume_download(novel.title)
+        self._add_book_image_and_details(novel)
+
+    @threaded_task
+    def check_new_chapters(self, novel):
+        new_chapters = self.downloader.check_new_chapters(novel)
+        if new_chapters:
+            self.downloaded_novels.discard(novel.title)
+        def update_gui():
+            self._add_book_image_and_details(novel)
+        self.root.after(0, update_gui)
+
     @threaded_task
     def delete_novel(self, novel):
         success = self.downloader.delete_novel(novel)
@@ -396,7 +424,17 @@ class NovelUI:
             download_button.config(state=tk.DISABLED)
         download_button.grid(row=0, column=1, padx=5, pady=5)
 
-        ttk.Button(button_frame, text="Delete", command=lambda: self.delete_novel(novel)).grid(row=0, column=2, padx=5, pady=5)
+        ttk.Button(button_frame, text="Check Updates", command=lambda: self.check_new_chapters(novel)).grid(row=0, column=2, padx=5, pady=5)
+
+        if self.downloader.is_download_paused(novel.title):
+            pause_button = ttk.Button(button_frame, text="Resume", command=lambda: self.resume_download(novel))
+        else:
+            pause_button = ttk.Button(button_frame, text="Pause", command=lambda: self.pause_download(novel))
+        if novel.title in self.downloaded_novels:
+            pause_button.config(state=tk.DISABLED)
+        pause_button.grid(row=0, column=3, padx=5, pady=5)
+
+        ttk.Button(button_frame, text="Delete", command=lambda: self.delete_novel(novel)).grid(row=0, column=4, padx=5, pady=5)
 
     def destroy_details_section(self):
         for widget in self.details_frame.winfo_children():
@@ -407,5 +445,5 @@ class NovelUI:
 
     def close(self):
         print("============== CLOSING APPLICATION ==============")
-        self.downloader.scrapper.close()
+        self.downloader.close()
         self.root.destroy()
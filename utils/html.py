@@ -0,0 +1,48 @@
+import lxml.html
+from lxml.html import HtmlElement
+
+challenge_markers = [
+    'cf-browser-verification',
+    'challenge-platform',
+    'cf-chl-',
+    '<title>Just a moment...</title>',
+    'g-recaptcha',
+    'h-captcha',
+]
+
+challenge_titles = [
+    'Just a moment...',
+    'Attention Required!',
+    'Access denied',
+]
+
+
+def parse(html: str, base_url: str = None) -> HtmlElement:
+    return lxml.html.fromstring(html, base_url=base_url)
+
+
+def get_element(tree: HtmlElement, css_selector: str) -> HtmlElement | None:
+    elements = tree.cssselect(css_selector)
+    if not elements:
+        return None
+    return elements[0]
+
+
+def get_text(element: HtmlElement) -> str:
+    return ' '.join(element.text_content().split())
+
+
+def get_lines(element: HtmlElement) -> str:
+    # Line breaks are rendered as new lines, like the browser's innerText
+    for br in element.iter('br'):
+        br.tail = '\n' + (br.tail or '')
+    lines = (' '.join(line.split()) for line in element.text_content().splitlines())
+    return '\n'.join(line for line in lines if line)
+
+
+def is_challenge_page(html: str) -> bool:
+    return any(marker in html for marker in challenge_markers)
+
+
+def is_challenge_title(title: str) -> bool:
+    return any(title.startswith(challenge_title) for challenge_title in challenge_titles)
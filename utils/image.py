@@ -1,8 +1,11 @@
+import os
 from urllib.parse import urlparse, unquote
 
 from selenium import webdriver
 from selenium.webdriver.common.by import By
 
+from utils import selenium as selenium_utils
+
 
 def get_image_name(url):
     parsed_url = urlparse(url)
@@ -22,17 +25,30 @@ def get_path_and_name(url, image_name=None, extension='.jpg') -> tuple[str, str]
     return f'internal/img/covers/{image_name}', image_name
 
 
+def is_image_data(content: bytes) -> bool:
+    """
+    Tells whether the bytes start like a JPEG, PNG, GIF or WebP file, challenge pages don't.
+    """
+    return content.startswith((b'\xff\xd8\xff', b'\x89PNG', b'GIF8')) or (
+            content[:4] == b'RIFF' and content[8:12] == b'WEBP')
+
+
 def download_with_screenshot(driver: webdriver.Chrome, novel_title: str, img_src: str) -> str:
     image_path, image_name = get_path_and_name(img_src, novel_title, '.png')
+    if os.path.exists(image_path):
+        # Covers are kept on disk, only new ones need the browser
+        return image_name
 
     main_window = driver.current_window_handle
-    # Open image in a new tab
-    driver.execute_script(f'window.open("{img_src}", "_blank");')
-    driver.switch_to.window(driver.window_handles[-1])
-    ok = driver.find_element(By.CSS_SELECTOR, 'body > img').screenshot(image_path)
-    if not ok:
-        print('Error downloading', img_src, image_path)
-    driver.close()
-    driver.switch_to.window(main_window)
+    # The scraping profile blocks images
+    with selenium_utils.allow_resources(driver):
+        # Open image in a new tab
+        driver.execute_script(f'window.open("{img_src}", "_blank");')
+        driver.switch_to.window(driver.window_handles[-1])
+        ok = driver.find_element(By.CSS_SELECTOR, 'body > img').screenshot(image_path)
+        if not ok:
+            print('Error downloading', img_src, image_path)
+        driver.close()
+        driver.switch_to.window(main_window)
 
     return image_name
@@ -1,8 +1,48 @@
+from contextlib import contextmanager
+
+from selenium.common.exceptions import TimeoutException
 from selenium.webdriver.common.by import By
 from selenium.webdriver.remote.webelement import WebElement
 from selenium.webdriver.support import expected_conditions as EC
 from selenium.webdriver.support.wait import WebDriverWait
 
+# Resources the scraping profile never loads, chapter pages are only read for their text
+blocked_url_patterns = [
+    '*.png*', '*.jpg*', '*.jpeg*', '*.gif*', '*.webp*', '*.svg*', '*.ico*', '*.bmp*', '*.avif*',
+    '*.woff*', '*.ttf*', '*.otf*', '*.eot*',
+    '*.mp4*', '*.webm*', '*.mp3*', '*.m3u8*',
+    '*doubleclick.net*', '*googlesyndication.com*', '*googletagmanager.com*', '*google-analytics.com*',
+    '*adservice.google.*', '*amazon-adsystem.com*', '*facebook.net*', '*scorecardresearch.com*',
+    '*criteo.com*', '*taboola.com*', '*outbrain.com*', '*pubmatic.com*', '*adnxs.com*', '*rubiconproject.com*',
+    '*popads.net*', '*propellerads.com*', '*disqus.com*', '*hotjar.com*',
+]
+
+
+def block_resources(driver, patterns: list[str] = None):
+    """
+    Blocks the requests matching `patterns` (default `blocked_url_patterns`) through CDP.
+    """
+    driver.blocked_url_patterns = patterns if patterns is not None else blocked_url_patterns
+    driver.execute_cdp_cmd('Network.enable', {})
+    driver.execute_cdp_cmd('Network.setBlockedURLs', {'urls': driver.blocked_url_patterns})
+
+
+@contextmanager
+def allow_resources(driver):
+    """
+    Lifts the blocking of `block_resources` for the duration of the block.
+    """
+    patterns = getattr(driver, 'blocked_url_patterns', None)
+    if not patterns:
+        yield
+        return
+
+    driver.execute_cdp_cmd('Network.setBlockedURLs', {'urls': []})
+    try:
+        yield
+    finally:
+        driver.execute_cdp_cmd('Network.setBlockedURLs', {'urls': patterns})
+
 
 def get_element(element_or_driver, by=By.ID, key: str = None) -> WebElement | None:
     elements = element_or_driver.find_elements(by, key)
@@ -11,6 +51,113 @@ def get_element(element_or_driver, by=By.ID, key: str = None) -> WebElement | No
     return elements[0]
 
 
+def get_links(driver, css_selector: str) -> list[tuple[str, str]] | None:
+    """
+    Returns the (title, href) of every link inside the first element matching `css_selector`,
+    in a single round trip to the driver. None if there is no such element.
+    """
+    links = driver.execute_script(
+        """
+        const container = document.querySelector(arguments[0]);
+        if (!container) {
+            return null;
+        }
+        return Array.from(container.querySelectorAll('a'), a => [a.getAttribute('title'), a.href]);
+        """,
+        css_selector,
+    )
+    return [tuple(link) for link in links] if links is not None else None
+
+
+def read_elements(driver, properties: dict[str, tuple[str, str]]) -> dict[str, str | None]:
+    """
+    Reads a property of several elements in a single round trip to the driver.
+    `properties` maps a key to a (css selector, property name) pair, e.g. ('#cover > img', 'src').
+    Missing elements are returned as None, text is trimmed.
+    """
+    return driver.execute_script(
+        """
+        const result = {};
+        for (const [key, [selector, property]] of Object.entries(arguments[0])) {
+            const element = document.querySelector(selector);
+            const value = element ? element[property] : null;
+            result[key] = typeof value === 'string' ? value.trim() : value;
+        }
+        return result;
+        """,
+        properties,
+    )
+
+
+def get_paragraphs_text(driver, css_selector: str) -> str | None:
+    """
+    Returns the text of the paragraphs inside the first element matching `css_selector`, one per line,
+    in a single round trip to the driver. Falls back to the element's whole text when it has no paragraphs.
+    None if there is no such element.
+    """
+    return driver.execute_script(
+        """
+        const container = document.querySelector(arguments[0]);
+        if (!container) {
+            return null;
+        }
+        const paragraphs = container.querySelectorAll('p');
+        if (paragraphs.length === 0) {
+            return container.innerText.trim();
+        }
+        return Array.from(paragraphs, p => p.innerText).join('\\n').trim();
+        """,
+        css_selector,
+    )
+
+
+def _wait_for_script(driver, script: str, css_selector: str, timeout: float) -> bool:
+    try:
+        WebDriverWait(driver, timeout, poll_frequency=0.1).until(lambda d: d.execute_script(script, css_selector))
+        return True
+    except TimeoutException:
+        return False
+
+
+def wait_for_text(driver, css_selector: str, timeout: float = 10) -> bool:
+    """
+    Waits until the first element matching `css_selector` has text, in its paragraphs when it has any.
+    False if it didn't happen within `timeout` seconds.
+    """
+    return _wait_for_script(
+        driver,
+        """
+        const container = document.querySelector(arguments[0]);
+        if (!container) {
+            return false;
+        }
+        const paragraphs = container.querySelectorAll('p');
+        if (paragraphs.length === 0) {
+            return container.innerText.trim().length > 0;
+        }
+        return Array.from(paragraphs).some(p => p.innerText.trim().length > 0);
+        """,
+        css_selector,
+        timeout,
+    )
+
+
+def wait_for_links(driver, css_selector: str, timeout: float = 10) -> bool:
+    """
+    Waits until the first element matching `css_selector` contains a link.
+    False if it didn't happen within `timeout` seconds.
+    """
+    return _wait_for_script(
+        driver,
+        """
+        const container = document.querySelector(arguments[0]);
+        return container !== null && container.querySelector('a[href]') !== null;
+        """,
+        css_selector,
+        timeout,
+    )
+
+
 def wait_and_click(driver, element):
     driver.execute_script("arguments[0].scrollIntoView();", element)
     wait = WebDriverWait(driver, 10)